@@ -0,0 +1,185 @@
+import argparse  # Import the argparse module for the command line interface
+import time  # Import the time module for measuring throughput
+import numpy as np  # Import the numpy module for numerical operations
+from constants import *  # Import all constants from the constants module
+from engine import GameEngine, SIMDT  # Import the GameEngine class and default timestep from the engine module
+
+NONE = -1  # Define the index used for a missing neighbor, edge or pellet
+SLOTS = [UP, DOWN, LEFT, RIGHT, PORTAL]  # Define the direction stored in each neighbor column
+SLOTOF = np.array([3, 1, NONE, 0, 2], dtype=np.int64)  # Map a direction code plus 2 to its neighbor column, or NONE for STOP
+UNIT = np.array([[1, 0], [0, 1], [0, 0], [0, -1], [-1, 0]], dtype=np.float64)  # Map a direction code plus 2 to its unit vector
+
+class BatchSimulator(object):  # Define a class stepping many independent Pacman games at once with NumPy
+    def __init__(self, nodes, pellets, numAgents, dt=SIMDT, startNode=None, speed=100 * TILEWIDTH / 16, collideRadius=5):  # Initialize from a node group and pellet group
+        self.numAgents = numAgents  # Set the number of agents
+        self.dt = dt  # Set the fixed timestep
+        self.speed = speed  # Set Pacman's speed in pixels per second
+        self.collideRadius = collideRadius  # Set Pacman's collision radius
+        nodeList = list(nodes.nodesLUT.values())  # Get the nodes in index order
+        index = {node: i for i, node in enumerate(nodeList)}  # Map each node to its index
+        self.nodePos = np.array([node.position.asTuple() for node in nodeList], dtype=np.float64)  # Store each node's position
+        self.neighbor = np.full((len(nodeList), len(SLOTS)), NONE, dtype=np.int64)  # Initialize every neighbor as missing
+        for i, node in enumerate(nodeList):  # Iterate through each node
+            for slot, direction in enumerate(SLOTS):  # Iterate through each neighbor column
+                if node.neighbors[direction] is not None:  # If the neighbor exists
+                    self.neighbor[i, slot] = index[node.neighbors[direction]]  # Store the neighbor's index
+        self.buildPelletTables(nodeList, pellets)  # Export the pellets as flat arrays
+        if startNode is None:  # If no start node was given
+            startNode = nodes.getStartTempNode()  # Start where a single Pacman would
+        self.startNode = index[startNode]  # Set the index of the start node
+        self.reset()  # Put every agent at the start
+
+    def buildPelletTables(self, nodeList, pellets):  # Define the method to export pellets by tile and by edge
+        self.points = np.array([pellet.points for pellet in pellets.pellets], dtype=np.float32)  # Store each pellet's points
+        self.radius = np.array([pellet.radius for pellet in pellets.pellets], dtype=np.float64)  # Store each pellet's radius
+        self.pelletPos = np.array([pellet.position.asTuple() for pellet in pellets.pellets], dtype=np.float64).reshape(-1, 2)  # Store each pellet's position
+        cols = max([pellet.tile[0] for pellet in pellets.pellets] + [0]) + 2  # Get the tile grid width with a border
+        rows = max([pellet.tile[1] for pellet in pellets.pellets] + [0]) + 2  # Get the tile grid height with a border
+        self.tileGrid = np.full((rows, cols), NONE, dtype=np.int64)  # Initialize every tile as empty
+        for pellet in pellets.pellets:  # Iterate through each pellet
+            self.tileGrid[pellet.tile[1], pellet.tile[0]] = pellet.index  # Store the pellet on its tile
+        self.edgeId = np.full((len(nodeList), 4), NONE, dtype=np.int64)  # Initialize the directed edge leaving each node in each direction
+        tiles = []  # Create an empty list of each edge's pellet per tile step
+        for i, node in enumerate(nodeList):  # Iterate through each node
+            for slot in range(4):  # Iterate through each walkable direction
+                neighbor = node.neighbors[SLOTS[slot]]  # Get the neighbor in that direction
+                if neighbor is not None:  # If there is an edge
+                    length = int(round(neighbor.position.distanceSquared(node.position) ** 0.5 / TILEWIDTH))  # Get the edge length in tiles
+                    row = [NONE] * (length + 1)  # Initialize every tile of the edge as empty
+                    for pellet in pellets.pelletsBetween(node.position, neighbor.position):  # Iterate through the pellets on the edge
+                        row[int(round(pellet.position.distanceSquared(node.position) ** 0.5 / TILEWIDTH))] = pellet.index  # Store the pellet by tile step
+                    self.edgeId[i, slot] = len(tiles)  # Record the edge's index
+                    tiles.append(row)  # Add the edge's tiles
+        width = max([len(row) for row in tiles] + [1])  # Get the longest edge in tiles
+        self.edgeTiles = np.full((len(tiles), width), NONE, dtype=np.int64)  # Initialize a padded table of edge tiles
+        for e, row in enumerate(tiles):  # Iterate through each edge
+            self.edgeTiles[e, :len(row)] = row  # Copy the edge's tiles
+        self.reach = self.collideRadius + (self.radius.max() if len(self.radius) else 0)  # Get the furthest any pellet can be touched from
+
+    def reset(self):  # Define the method to put every agent back at the start with all pellets
+        n = self.numAgents  # Get the number of agents
+        self.node = np.full(n, self.startNode, dtype=np.int64)  # Set the node each agent left
+        self.target = np.full(n, self.startNode, dtype=np.int64)  # Set the node each agent is heading to
+        self.position = np.repeat(self.nodePos[self.startNode][None, :], n, axis=0)  # Set each agent's position
+        self.direction = np.zeros(n, dtype=np.int64)  # Set each agent's direction to STOP
+        self.eaten = np.zeros((n, len(self.points)), dtype=bool)  # Set every agent's pellets as uneaten
+        self.numEaten = np.zeros(n, dtype=np.int32)  # Set each agent's eaten count
+        self.score = np.zeros(n, dtype=np.float32)  # Set each agent's score
+        return self.observe()  # Return the starting observations
+
+    def getNewTarget(self, agents, direction):  # Define the method to get the neighbor in a direction, or the node itself
+        slot = SLOTOF[direction + 2]  # Get each direction's neighbor column
+        node = self.node[agents]  # Get each agent's node
+        neighbor = np.where(slot >= 0, self.neighbor[node, np.maximum(slot, 0)], NONE)  # Look up the neighbor, ignoring STOP
+        return np.where(neighbor >= 0, neighbor, node)  # Fall back to the node when there is no neighbor
+
+    def eat(self, agents, pellet, hit, rewards):  # Define the method to mark touched pellets eaten and score them once
+        hit = hit & (pellet >= 0)  # Ignore empty tiles
+        agents = agents[hit]  # Keep the agents that touched a pellet
+        pellet = pellet[hit]  # Keep the pellets touched
+        fresh = ~self.eaten[agents, pellet]  # Find the pellets not eaten before
+        agents = agents[fresh]  # Keep the agents eating a new pellet
+        pellet = pellet[fresh]  # Keep the new pellets
+        self.eaten[agents, pellet] = True  # Mark the pellets eaten
+        np.add.at(rewards, agents, self.points[pellet])  # Add the pellets' points to the rewards
+        np.add.at(self.numEaten, agents, 1)  # Count the pellets eaten
+
+    def eatAlong(self, agents, start, end, rewards):  # Define the method to eat the pellets touched by swept edge spans
+        slot = SLOTOF[self.direction[agents] + 2]  # Get the column of each agent's direction of travel
+        edge = self.edgeId[self.node[agents], slot]  # Get the directed edge each agent swept
+        first = np.maximum(np.ceil((start - self.reach) / TILEWIDTH), 0).astype(np.int64)  # Get the first tile in reach
+        last = np.minimum(np.floor((end + self.reach) / TILEWIDTH), self.edgeTiles.shape[1] - 1).astype(np.int64)  # Get the last tile in reach
+        for k in range(int((last - first).max()) + 1 if len(agents) else 0):  # Iterate through the tiles in reach, one column at a time
+            tile = first + k  # Get each agent's tile
+            live = tile <= last  # Keep agents whose range covers the tile
+            pellet = self.edgeTiles[edge, np.minimum(tile, self.edgeTiles.shape[1] - 1)]  # Look up the pellet on the tile
+            offset = tile * float(TILEWIDTH)  # Get the tile's distance from the node
+            gap = np.maximum(np.maximum(start - offset, offset - end), 0)  # Get the tile's distance from the span
+            hit = live & (gap <= self.radius[pellet] + self.collideRadius)  # Find the pellets touched
+            self.eat(agents, pellet, hit, rewards)  # Eat them
+
+    def eatNear(self, rewards):  # Define the method to eat pellets touching each agent's final position
+        agents = np.arange(self.numAgents)  # Get every agent
+        col = np.round(self.position[:, 0] / TILEWIDTH).astype(np.int64)  # Find the nearest tile column
+        row = np.round(self.position[:, 1] / TILEHEIGHT).astype(np.int64)  # Find the nearest tile row
+        rows, cols = self.tileGrid.shape  # Get the tile grid size
+        for drow in (-1, 0, 1):  # Iterate through the neighboring rows
+            for dcol in (-1, 0, 1):  # Iterate through the neighboring columns
+                r = row + drow  # Get the tile row
+                c = col + dcol  # Get the tile column
+                inside = (r >= 0) & (r < rows) & (c >= 0) & (c < cols)  # Keep tiles inside the grid
+                pellet = np.where(inside, self.tileGrid[np.clip(r, 0, rows - 1), np.clip(c, 0, cols - 1)], NONE)  # Look up the pellet on the tile
+                d = self.position - self.pelletPos[pellet]  # Get the offset to the pellet
+                hit = inside & ((d * d).sum(axis=1) <= (self.radius[pellet] + self.collideRadius) ** 2)  # Find the pellets touched
+                self.eat(agents, pellet, hit, rewards)  # Eat them
+
+    def step(self, actions, dt=None):  # Define the method to advance every agent by one tick
+        if dt is None:  # If no timestep was given
+            dt = self.dt  # Use the fixed timestep
+        actions = np.asarray(actions, dtype=np.int64)  # Get each agent's requested direction
+        rewards = np.zeros(self.numAgents, dtype=np.float32)  # Initialize each agent's reward
+        reverse = (actions != STOP) & (actions == -self.direction)  # Find agents asking to turn around
+        self.node[reverse], self.target[reverse] = self.target[reverse], self.node[reverse].copy()  # Swap their node and target
+        self.direction[reverse] *= -1  # Reverse their direction
+        remaining = np.full(self.numAgents, self.speed * dt)  # Get the distance each agent travels this step
+        agents = np.arange(self.numAgents)  # Start with every agent moving
+        while len(agents):  # Keep going while any agent has distance and direction left
+            pos = self.position[agents]  # Get the moving agents' positions
+            delta = self.nodePos[self.target[agents]] - pos  # Get the offset to each target node
+            toTarget = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])  # Get the distance left to each target node
+            travel = np.minimum(remaining[agents], toTarget)  # Move no further than the target node
+            moving = travel > 0  # Find agents that move along an edge
+            if moving.any():  # If any agent moves
+                covered = pos[moving] - self.nodePos[self.node[agents[moving]]]  # Get the offset already covered from the node
+                start = np.sqrt(covered[:, 0] * covered[:, 0] + covered[:, 1] * covered[:, 1])  # Get the distance already covered
+                self.eatAlong(agents[moving], start, start + travel[moving], rewards)  # Eat pellets along the swept span
+                self.position[agents] += UNIT[self.direction[agents] + 2] * travel[:, None]  # Update the positions
+                remaining[agents] -= travel  # Use up the distance traveled
+            agents = agents[travel >= toTarget]  # Keep only agents that reached their target
+            self.node[agents] = self.target[agents]  # Set the current node to the target
+            portal = self.neighbor[self.node[agents], SLOTS.index(PORTAL)]  # Get any portal partner
+            self.node[agents] = np.where(portal >= 0, portal, self.node[agents])  # Move through portals
+            target = self.getNewTarget(agents, actions[agents])  # Get the new target based on the requested direction
+            turned = target != self.node[agents]  # Find agents that can go the requested way
+            self.direction[agents[turned]] = actions[agents[turned]]  # Update their direction
+            keep = self.getNewTarget(agents, self.direction[agents])  # Get the new target based on the current direction
+            self.target[agents] = np.where(turned, target, keep)  # Set the new target
+            stopped = self.target[agents] == self.node[agents]  # Find agents with nowhere to go
+            self.direction[agents[stopped]] = STOP  # Stop them
+            self.position[agents] = self.nodePos[self.node[agents]]  # Set the position to the node's position
+            agents = agents[(self.direction[agents] != STOP) & (remaining[agents] > 0)]  # Keep agents still moving with distance left
+        self.eatNear(rewards)  # Eat pellets touching the final positions
+        self.score += rewards  # Add the rewards to the scores
+        dones = self.numEaten == len(self.points)  # Find agents that have eaten everything
+        return self.observe(), rewards, dones  # Return the observations, rewards and finished flags
+
+    def observe(self):  # Define the method to get every agent's state as one contiguous array
+        covered = self.position - self.nodePos[self.node]  # Get the offset covered from each node
+        progress = np.sqrt((covered * covered).sum(axis=1))  # Get the distance covered from each node
+        return np.ascontiguousarray(np.stack([self.position[:, 0], self.position[:, 1], self.direction,
+                                              self.node, self.target, progress], axis=1), dtype=np.float32)  # Return x, y, direction, node, target and progress
+
+    @classmethod
+    def fromLevel(cls, level, numAgents, dt=SIMDT):  # Define a constructor building the maze the way the engine does
+        engine = GameEngine(level, dt=dt)  # Build the nodes, portals and pellets for the level
+        return cls(engine.nodes, engine.pellets, numAgents, dt, engine.pacman.node,
+                   engine.pacman.speed, engine.pacman.collideRadius)  # Return the batch simulator
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Step many Pacman agents at once with random actions")  # Create the argument parser
+    parser.add_argument("--maze", default="maze1.txt")  # Add the maze file option
+    parser.add_argument("--agents", type=int, default=4096)  # Add the number of agents option
+    parser.add_argument("--ticks", type=int, default=1000)  # Add the number of ticks option
+    parser.add_argument("--seed", type=int, default=0)  # Add the random seed option
+    args = parser.parse_args()  # Parse the command line
+    sim = BatchSimulator.fromLevel(args.maze, args.agents)  # Create the batch simulator
+    rng = np.random.default_rng(args.seed)  # Create a seeded random generator
+    choices = np.array([UP, DOWN, LEFT, RIGHT])  # Define the directions to pick from
+    actions = rng.choice(choices, args.agents)  # Pick each agent's first direction
+    start = time.perf_counter()  # Record the start time
+    for tick in range(args.ticks):  # Iterate through each tick
+        change = rng.random(args.agents) < 1.0 / 15  # Pick agents that change direction this tick
+        actions[change] = rng.choice(choices, int(change.sum()))  # Give them a new direction
+        sim.step(actions)  # Advance every agent
+    elapsed = time.perf_counter() - start  # Calculate the elapsed time
+    print("agent-steps/sec=%.0f mean score=%.1f" % (args.agents * args.ticks / elapsed, sim.score.mean()))  # Print the results
@@ -0,0 +1,132 @@
+import argparse  # Import the argparse module for the command line interface
+import gc  # Import the gc module for counting garbage collections
+import json  # Import the json module for reading and writing results
+import os  # Import the os module for file paths and the video driver
+import sys  # Import the sys module for the exit status
+import tempfile  # Import the tempfile module for synthetic maze files
+import time  # Import the time module for timing
+import tracemalloc  # Import the tracemalloc module for measuring allocations
+from constants import *  # Import all constants from the constants module
+from engine import GameEngine, PHASES  # Import the GameEngine class and profiled phases from the engine module
+from inputs import RandomInput, ScriptedInput  # Import the random and scripted input providers
+from profiler import FrameProfiler  # Import the FrameProfiler class from the profiler module
+from mazegen import writeMaze  # Import the synthetic maze generator
+
+SYNTHETIC = {"synthetic40": (40, 40), "synthetic150": (150, 150), "synthetic400": (400, 400)}  # Define the synthetic mazes by lattice size
+
+def benchMovement(level="maze1.txt", steps=200000, seed=0):  # Define the movement and collision micro-benchmark
+    engine = GameEngine(level, RandomInput(seed))  # Create a headless engine with seeded random input
+    engine.run(1000)  # Warm up the engine before measuring
+    collections = [0]  # Initialize the count of garbage collections
+    def onCollect(phase, info):  # Define the callback run around each garbage collection
+        if phase == "start":  # If a collection is starting
+            collections[0] += 1  # Count the collection
+    gc.callbacks.append(onCollect)  # Register the callback
+    start = time.perf_counter_ns()  # Record the start time
+    for i in range(steps):  # Iterate through each step
+        engine.step()  # Advance the simulation
+    elapsed = time.perf_counter_ns() - start  # Calculate the elapsed time
+    gc.callbacks.remove(onCollect)  # Unregister the callback
+    samples = min(steps, 10000)  # Limit the traced steps because tracing is slow
+    transient = 0  # Initialize the total of transient bytes
+    tracemalloc.start()  # Start tracing allocations
+    for i in range(samples):  # Iterate through each traced step
+        tracemalloc.reset_peak()  # Forget the previous peak
+        before = tracemalloc.get_traced_memory()[0]  # Record the memory in use before the step
+        engine.step()  # Advance the simulation
+        transient += tracemalloc.get_traced_memory()[1] - before  # Add the memory the step needed at its peak
+    tracemalloc.stop()  # Stop tracing allocations
+    return {  # Return the results
+        "level": level,  # The maze used
+        "steps": steps,  # The number of timed steps
+        "nsPerStep": elapsed / steps,  # The average time of one step in nanoseconds
+        "bytesPerStep": transient / samples,  # The average peak of temporary memory during one step
+        "gcPerMillionSteps": collections[0] * 1000000.0 / steps,  # The garbage collections per million steps
+    }
+
+def makeScript(ticks, seed=0):  # Define the function to build a fixed input script
+    source = RandomInput(seed)  # Create a seeded random input
+    return [source.getDirection(None) for i in range(ticks)]  # Roll the random input into a fixed list
+
+def benchSteps(level, script):  # Define the headless simulation benchmark
+    engine = GameEngine(level, ScriptedInput(script))  # Create a headless engine replaying the script
+    start = time.perf_counter()  # Record the start time
+    for i in range(len(script)):  # Iterate through each scripted tick
+        engine.step()  # Advance the simulation
+    elapsed = time.perf_counter() - start  # Calculate the elapsed time
+    return {"stepsPerSec": len(script) / elapsed, "score": engine.score}  # Return the throughput and the final score
+
+def benchRender(level, script):  # Define the rendering benchmark
+    import pygame  # Import pygame only when rendering is benchmarked
+    from renderer import MazeRenderer, ViewportRenderer  # Import the renderers from the renderer module
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Render without a window unless a driver was chosen
+    engine = GameEngine(level, ScriptedInput(script))  # Create an engine replaying the script
+    rows, cols = engine.nodes.maze.grid.shape  # Get the maze size in tiles
+    pygame.init()  # Initialize all imported pygame modules
+    screen = pygame.display.set_mode(SCREENSIZE, 0, 32)  # Set up a display of the normal screen size
+    background = pygame.surface.Surface(screen.get_size()).convert()  # Create the background surface
+    background.fill(BLACK)  # Fill the background with black color
+    if cols <= NCOLS and rows <= NROWS:  # If the whole maze fits on the screen
+        renderer = MazeRenderer(screen, background, engine.nodes, engine.pellets)  # Bake the maze into the renderer
+    else:  # Otherwise the maze must scroll
+        renderer = ViewportRenderer(screen, background, engine.nodes, engine.pellets)  # Draw only what the viewport sees
+    profiler = FrameProfiler(PHASES, capacity=len(script))  # Create a profiler holding every frame
+    engine.profiler = profiler  # Let the engine time its phases
+    for i in range(len(script)):  # Iterate through each scripted tick
+        profiler.startFrame()  # Start timing the frame
+        engine.step()  # Advance the simulation
+        renderer.render(engine.pacman)  # Draw the frame
+        profiler.lap("render")  # Charge the time to rendering
+        profiler.endFrame()  # Finish timing the frame
+    pygame.quit()  # Shut down pygame
+    samples = profiler.getSamples()[:, PHASES.index("render")] * 1000.0  # Get the render time of each frame in milliseconds
+    return {"renderer": type(renderer).__name__, "renderMsPerFrame": float(samples.mean()), "percentiles": profiler.percentiles()}  # Return the render cost
+
+def runSuite(ticks=20000, renderFrames=2000, seed=0):  # Define the function to run every benchmark on every maze
+    mazes = {"maze1": "maze1.txt", "mazetest": "mazetest.txt"}  # Start with the shipped mazes
+    with tempfile.TemporaryDirectory(prefix="pacmanbench") as tempdir:  # Create a directory for synthetic mazes, removed with their caches afterwards
+        for name, (cols, rows) in SYNTHETIC.items():  # Iterate through each synthetic maze
+            mazes[name] = writeMaze(os.path.join(tempdir, name + ".txt"), cols, rows, seed)  # Generate the maze file
+        script = makeScript(ticks, seed)  # Build the fixed input script
+        results = {}  # Create an empty table of results
+        for name, level in mazes.items():  # Iterate through each maze
+            results[name] = benchSteps(level, script)  # Measure headless throughput
+            results[name].update(benchRender(level, script[:renderFrames]))  # Measure rendering cost
+    return results  # Return the table of results
+
+def findRegressions(results, baseline, tolerance):  # Define the function to compare results with a saved baseline
+    regressions = []  # Create an empty list of regressions
+    for name, result in results.items():  # Iterate through each maze
+        old = baseline.get(name, {})  # Get the baseline for the maze
+        if "stepsPerSec" in old and result["stepsPerSec"] < old["stepsPerSec"] * (1 - tolerance):  # If throughput dropped too far
+            regressions.append("%s: %.0f steps/sec (was %.0f)" % (name, result["stepsPerSec"], old["stepsPerSec"]))  # Record the regression
+        if "renderMsPerFrame" in old and "renderMsPerFrame" in result and \
+                result["renderMsPerFrame"] > old["renderMsPerFrame"] * (1 + tolerance):  # If rendering slowed down too far
+            regressions.append("%s: %.3f render ms/frame (was %.3f)" % (name, result["renderMsPerFrame"], old["renderMsPerFrame"]))  # Record the regression
+    return regressions  # Return the regressions found
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Pacman benchmarks")  # Create the argument parser
+    parser.add_argument("bench", choices=["movement", "suite"])  # Add the benchmark to run
+    parser.add_argument("--maze", default="maze1.txt")  # Add the maze file option
+    parser.add_argument("--steps", type=int, default=200000)  # Add the number of steps option
+    parser.add_argument("--out", help="write suite results to this JSON file")  # Add the results file option
+    parser.add_argument("--baseline", help="fail if results regress against this JSON file")  # Add the baseline file option
+    parser.add_argument("--tolerance", type=float, default=0.2)  # Add the allowed slowdown option
+    args = parser.parse_args()  # Parse the command line
+    if args.bench == "movement":  # If the movement benchmark was chosen
+        result = benchMovement(args.maze, args.steps)  # Run the movement benchmark
+        print("%(level)s: %(nsPerStep).0f ns/step, %(bytesPerStep).0f bytes/step, %(gcPerMillionSteps).1f gc/1M steps" % result)  # Print the results
+    else:  # Otherwise run the whole suite
+        results = runSuite()  # Run every benchmark
+        for name, result in results.items():  # Iterate through each maze
+            print("%s: %.0f steps/sec, %.3f render ms/frame (%s)" % (name, result["stepsPerSec"], result["renderMsPerFrame"], result["renderer"]))  # Print the maze's results
+        if args.out:  # If a results file was requested
+            with open(args.out, "w") as f:  # Open the results file
+                json.dump(results, f, indent=2)  # Write the results
+        if args.baseline:  # If a baseline was given
+            with open(args.baseline) as f:  # Open the baseline file
+                regressions = findRegressions(results, json.load(f), args.tolerance)  # Compare against the baseline
+            for line in regressions:  # Iterate through each regression
+                print("REGRESSION " + line)  # Report the regression
+            sys.exit(1 if regressions else 0)  # Fail when anything regressed
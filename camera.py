@@ -0,0 +1,94 @@
+from constants import *  # Import all constants from the constants module
+
+CHUNKTILES = 8  # Define the width and height of a chunk in tiles
+CHUNKWIDTH = CHUNKTILES * TILEWIDTH  # Calculate the width of a chunk in pixels
+CHUNKHEIGHT = CHUNKTILES * TILEHEIGHT  # Calculate the height of a chunk in pixels
+MARGIN = 12  # Define how far past the screen edge something may start and still be seen, in pixels
+
+class ChunkIndex(object):  # Define a class bucketing nodes, edges and pellets by screen chunk
+    def __init__(self, nodes, pellets):  # Initialize the index from the node and pellet groups
+        self.pellets = pellets  # Set the pellet group
+        self.nodeChunks = {}  # Initialize the nodes in each chunk
+        self.edgeChunks = {}  # Initialize the edges crossing each chunk
+        self.pelletChunks = {}  # Initialize the pellets in each chunk
+        edges = set()  # Initialize the edges already bucketed
+        for node in nodes.nodesLUT.values():  # Iterate through each node
+            self.nodeChunks.setdefault(self.chunkOf(node.position.x, node.position.y), []).append(node)  # Bucket the node
+            for neighbor in node.neighbors.values():  # Iterate through each neighbor
+                if neighbor is not None and (neighbor, node) not in edges:  # If the neighbor exists and the edge is new
+                    edges.add((node, neighbor))  # Remember the edge so its reverse is skipped
+                    self.addEdge(node, neighbor)  # Bucket the edge in every chunk it crosses
+        for pellet in pellets.pellets:  # Iterate through each pellet
+            self.pelletChunks.setdefault(self.chunkOf(pellet.position.x, pellet.position.y), []).append(pellet)  # Bucket the pellet
+
+    def chunkOf(self, x, y):  # Define the method to get the chunk containing a pixel position
+        return int(x) // CHUNKWIDTH, int(y) // CHUNKHEIGHT  # Return the chunk coordinates
+
+    def addEdge(self, start, end):  # Define the method to bucket an edge in every chunk its bounding box crosses
+        col1, row1 = self.chunkOf(min(start.position.x, end.position.x), min(start.position.y, end.position.y))  # Get the top left chunk
+        col2, row2 = self.chunkOf(max(start.position.x, end.position.x), max(start.position.y, end.position.y))  # Get the bottom right chunk
+        for row in range(row1, row2 + 1):  # Iterate through each chunk row
+            for col in range(col1, col2 + 1):  # Iterate through each chunk column
+                self.edgeChunks.setdefault((col, row), []).append((start, end))  # Bucket the edge
+
+    def removeEdge(self, start, end):  # Define the method to unbucket an edge, stored either way round, from every chunk it crosses
+        col1, row1 = self.chunkOf(min(start.position.x, end.position.x), min(start.position.y, end.position.y))  # Get the top left chunk
+        col2, row2 = self.chunkOf(max(start.position.x, end.position.x), max(start.position.y, end.position.y))  # Get the bottom right chunk
+        for row in range(row1, row2 + 1):  # Iterate through each chunk row
+            for col in range(col1, col2 + 1):  # Iterate through each chunk column
+                bucket = self.edgeChunks.get((col, row), [])  # Get the chunk's edges
+                for edge in ((start, end), (end, start)):  # Iterate through both ways round
+                    if edge in bucket:  # If the edge is stored this way
+                        bucket.remove(edge)  # Unbucket it
+
+    def applyPatch(self, patch):  # Define the method to update only the chunks a hot-reloaded maze edit touched
+        for start, end in patch["removedEdges"]:  # Iterate through each edge removed
+            self.removeEdge(start, end)  # Unbucket it
+        for start, end in patch["addedEdges"]:  # Iterate through each edge added
+            self.addEdge(start, end)  # Bucket it
+        for node in patch["removedNodes"]:  # Iterate through each node removed
+            self.nodeChunks[self.chunkOf(node.position.x, node.position.y)].remove(node)  # Unbucket it
+        for node in patch["addedNodes"]:  # Iterate through each node added
+            self.nodeChunks.setdefault(self.chunkOf(node.position.x, node.position.y), []).append(node)  # Bucket it
+        for pellet in patch["removedPellets"]:  # Iterate through each pellet removed
+            self.pelletChunks[self.chunkOf(pellet.position.x, pellet.position.y)].remove(pellet)  # Unbucket it
+        for pellet in patch["addedPellets"]:  # Iterate through each pellet added
+            self.pelletChunks.setdefault(self.chunkOf(pellet.position.x, pellet.position.y), []).append(pellet)  # Bucket it
+
+    def chunksIn(self, left, top, width, height):  # Define the method to get the chunks overlapping a pixel rectangle
+        col1, row1 = self.chunkOf(max(0, left - MARGIN), max(0, top - MARGIN))  # Get the top left chunk with a margin
+        col2, row2 = self.chunkOf(left + width + MARGIN, top + height + MARGIN)  # Get the bottom right chunk with a margin
+        return [(col, row) for row in range(row1, row2 + 1) for col in range(col1, col2 + 1)]  # Return every chunk in the range
+
+    def visibleEdges(self, chunks):  # Define the method to get each edge in the given chunks once
+        seen = set()  # Initialize the edges already returned
+        edges = []  # Create an empty list of edges
+        for chunk in chunks:  # Iterate through each chunk
+            for edge in self.edgeChunks.get(chunk, ()):  # Iterate through each edge crossing the chunk
+                if edge not in seen:  # If the edge has not been returned yet
+                    seen.add(edge)  # Remember the edge
+                    edges.append(edge)  # Add the edge to the list
+        return edges  # Return the edges
+
+    def visibleNodes(self, chunks):  # Define the method to get the nodes in the given chunks
+        return [node for chunk in chunks for node in self.nodeChunks.get(chunk, ())]  # Return the nodes
+
+    def visiblePellets(self, chunks):  # Define the method to get the uneaten pellets in the given chunks
+        eaten = self.pellets.eaten  # Get the eaten state of every pellet
+        return [pellet for chunk in chunks for pellet in self.pelletChunks.get(chunk, ()) if not eaten[pellet.index]]  # Return the pellets
+
+class Viewport(object):  # Define a class for the visible window onto a maze larger than the screen
+    def __init__(self, width, height, worldWidth, worldHeight):  # Initialize the viewport with screen and maze sizes in pixels
+        self.width = width  # Set the viewport width
+        self.height = height  # Set the viewport height
+        self.worldWidth = worldWidth  # Set the maze width
+        self.worldHeight = worldHeight  # Set the maze height
+        self.left = 0  # Initialize the left edge of the view in maze pixels
+        self.top = 0  # Initialize the top edge of the view in maze pixels
+
+    def follow(self, position):  # Define the method to center the view on a position without leaving the maze
+        self.left = int(min(max(position.x - self.width // 2, 0), max(self.worldWidth - self.width, 0)))  # Clamp the left edge
+        self.top = int(min(max(position.y - self.height // 2, 0), max(self.worldHeight - self.height, 0)))  # Clamp the top edge
+
+    def getOffset(self):  # Define the method to get the shift from maze pixels to screen pixels
+        return self.left, self.top  # Return the top left corner of the view
@@ -1,7 +1,7 @@
 TILEWIDTH = 16  # Define the width of a tile in pixels
 TILEHEIGHT = 16  # Define the height of a tile in pixels
-NROWS = 36  # Define the number of rows in the game grid
-NCOLS = 28  # Define the number of columns in the game grid
+NROWS = 36  # Define the number of rows shown on screen; larger mazes scroll
+NCOLS = 28  # Define the number of columns shown on screen; larger mazes scroll
 SCREENWIDTH = NCOLS * TILEWIDTH  # Calculate the width of the screen in pixels
 SCREENHEIGHT = NROWS * TILEHEIGHT  # Calculate the height of the screen in pixels
 SCREENSIZE = (SCREENWIDTH, SCREENHEIGHT)  # Define the screen size as a tuple (width, height)
@@ -0,0 +1,89 @@
+import argparse  # Import the argparse module for the command line interface
+import time  # Import the time module for measuring throughput
+from constants import *  # Import all constants from the constants module
+from pacman import Pacman  # Import the Pacman class from the pacman module
+from nodes import NodeGroup  # Import the NodeGroup class from the nodes module
+from pellets import PelletGroup  # Import the PelletGroup class from the pellets module
+from inputs import RandomInput  # Import the random input provider for batch runs
+
+SIMDT = 1.0 / 30  # Define the default fixed timestep in seconds
+SIMRATE = 120  # Define the simulation ticks per second used by the windowed game
+PORTALS = [((0, 17), (27, 17))]  # Define the default portal pairs in tile coordinates
+PHASES = ["pacman", "pellets", "pelletEvents", "stream", "events", "reload", "render"]  # Define the profiled phases of a frame
+
+class GameEngine(object):  # Define a class that steps the simulation without any display
+    def __init__(self, level="maze1.txt", inputProvider=None, dt=SIMDT, portals=PORTALS, maze=None):  # Initialize the engine with a maze file or its compiled maze
+        self.level = level  # Set the level file
+        self.dt = dt  # Set the fixed timestep
+        self.portals = portals  # Set the portal pairs so a reloaded maze can restore them
+        self.nodes = NodeGroup(level, maze)  # Initialize the node group with the maze file
+        for pair1, pair2 in portals:  # Iterate through each portal pair
+            self.nodes.setPortalPair(pair1, pair2)  # Set the portal pair in the maze
+        self.pacman = Pacman(self.nodes.getStartTempNode(), inputProvider)  # Initialize Pacman with the starting node
+        self.pellets = PelletGroup(level, maze)  # Initialize the pellet group with the maze file
+        self.pellets.indexEdges(self.nodes)  # Sort the pellets along each maze edge for swept collision
+        self.score = 0  # Initialize the score
+        self.ticks = 0  # Initialize the number of simulated ticks
+        self.profiler = None  # Initialize the optional frame profiler
+        self.initialState = self.snapshot()  # Capture the starting state so the engine can be reused
+
+    def step(self, dt=None):  # Define the method to advance the simulation by one tick
+        if dt is None:  # If no timestep was given
+            dt = self.dt  # Use the fixed timestep
+        profiler = self.profiler  # Get the frame profiler, if any
+        self.pacman.update(dt)  # Update Pacman's state
+        if profiler is not None:  # If the frame is being profiled
+            profiler.lap("pacman")  # Charge the time to Pacman's update
+        self.pellets.update(dt)  # Update the pellet group's state
+        if profiler is not None:  # If the frame is being profiled
+            profiler.lap("pellets")  # Charge the time to the pellet update
+        eaten = self.checkPelletEvents()  # Check for pellet events
+        if profiler is not None:  # If the frame is being profiled
+            profiler.lap("pelletEvents")  # Charge the time to pellet events
+        self.ticks += 1  # Count the tick
+        return eaten  # Return the pellets eaten this tick
+
+    def checkPelletEvents(self):  # Define method to check for pellet events
+        eaten = self.pacman.eatPellets(self.pellets)  # Check which pellets Pacman ate this tick
+        for pellet in eaten:  # Iterate through each pellet eaten
+            self.score += self.pellets.eat(pellet)  # Mark the pellet eaten and add its points to the score
+        return eaten  # Return the eaten pellets
+
+    def snapshot(self):  # Define the method to capture the full simulation state
+        return {"ticks": self.ticks, "score": self.score,
+                "pacman": self.pacman.getState(), "pellets": self.pellets.getState()}  # Return the captured state
+
+    def restore(self, snapshot):  # Define the method to return to a captured simulation state
+        self.ticks = snapshot["ticks"]  # Restore the tick count
+        self.score = snapshot["score"]  # Restore the score
+        self.pacman.setState(snapshot["pacman"], self.nodes)  # Restore Pacman
+        self.pellets.setState(snapshot["pellets"])  # Restore the pellets
+
+    def reset(self, inputProvider=None, startNode=None):  # Define the method to start a new game on the same maze
+        self.restore(self.initialState)  # Return to the starting state
+        if inputProvider is not None:  # If a new input provider was given
+            self.pacman.inputProvider = inputProvider  # Use it from now on
+        if startNode is not None:  # If a different start node was given
+            self.pacman.node = startNode  # Start from the node
+            self.pacman.target = startNode  # Wait at the node for input
+            self.pacman.setPosition()  # Set the position to the node's position
+            self.pacman.previousPosition.copyFrom(self.pacman.position)  # Do not interpolate from the old start
+
+    def run(self, steps):  # Define the method to run a fixed number of ticks
+        for i in range(steps):  # Iterate through each tick
+            self.step()  # Advance the simulation
+            if self.pellets.isEmpty():  # If every pellet has been eaten
+                break  # Stop early
+        return self.ticks  # Return the total number of ticks simulated
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Run Pacman headless with random input")  # Create the argument parser
+    parser.add_argument("--maze", default="maze1.txt")  # Add the maze file option
+    parser.add_argument("--ticks", type=int, default=100000)  # Add the number of ticks option
+    parser.add_argument("--seed", type=int, default=0)  # Add the random seed option
+    args = parser.parse_args()  # Parse the command line
+    engine = GameEngine(args.maze, RandomInput(args.seed))  # Create the engine with random input
+    start = time.perf_counter()  # Record the start time
+    ticks = engine.run(args.ticks)  # Run the simulation
+    elapsed = time.perf_counter() - start  # Calculate the elapsed time
+    print("ticks=%d score=%d eaten=%d steps/sec=%.0f" % (ticks, engine.score, engine.pellets.numEaten, ticks / elapsed))  # Print the results
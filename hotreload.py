@@ -0,0 +1,210 @@
+import argparse  # Import the argparse module for the command line interface
+import os  # Import the os module for watching the maze file
+import time  # Import the time module for timing reloads
+import numpy as np  # Import the numpy module for diffing grids
+from constants import *  # Import all constants from the constants module
+from mazecompiler import compileGrid, parseMaze, nodeMask, pelletKinds  # Import the maze compiler
+from nodes import NodeGroup  # Import the NodeGroup class from the nodes module
+from pellets import PelletGroup  # Import the PelletGroup class from the pellets module
+
+class MazeReloader(object):  # Define a class that patches a running engine when its maze file changes
+    def __init__(self, engine, interval=0.25):  # Initialize with the engine to patch and the seconds between file checks
+        self.engine = engine  # Set the engine
+        self.interval = interval  # Set the time between file checks
+        self.grid = engine.nodes.maze.grid.copy()  # Keep the symbols the engine was built from
+        self.mtime = os.stat(engine.level).st_mtime_ns  # Record when the maze file was last changed
+        self.lastCheck = time.perf_counter()  # Record the time of the last file check
+        self.reloads = 0  # Initialize the number of reloads done
+
+    def poll(self):  # Define the method to reload the maze if its file changed, checking at most every interval
+        now = time.perf_counter()  # Get the time
+        if now - self.lastCheck < self.interval:  # If the file was checked recently
+            return None  # Skip the check
+        self.lastCheck = now  # Record the check
+        try:  # Try to read the file's change time
+            mtime = os.stat(self.engine.level).st_mtime_ns  # Get it
+        except OSError:  # If the file is being replaced
+            return None  # Try again next check
+        if mtime == self.mtime:  # If the file has not changed
+            return None  # Nothing to do
+        self.mtime = mtime  # Record the change
+        with open(self.engine.level, "rb") as f:  # Open the maze file
+            raw = f.read()  # Read the maze text
+        try:  # Try to parse the maze
+            grid = parseMaze(raw)  # Parse it
+        except ValueError:  # If the rows have different lengths, usually because the file is half written
+            return None  # Wait for the next change
+        return self.reload(grid)  # Patch the engine
+
+    def reload(self, grid):  # Define the method to patch the engine to match a new grid and report what changed
+        start = time.perf_counter()  # Record the start time
+        if grid.shape != self.grid.shape:  # If the maze changed size
+            self.rebuild(grid)  # Rebuild everything
+            return {"cells": grid.size, "rows": grid.shape[0], "cols": grid.shape[1], "seconds": time.perf_counter() - start}  # Report the rebuild
+        diff = grid != self.grid  # Compare every cell
+        rows = np.flatnonzero(diff.any(axis=1))  # Find the changed rows first, which is much cheaper than searching every cell
+        changedRows, changedCols = np.nonzero(diff[rows])  # Find the changed cells on those rows
+        changedRows = rows[changedRows]  # Turn the positions back into row numbers
+        if len(changedRows) == 0:  # If nothing changed
+            return None  # Nothing to do
+        rowStretches = self.stretches(self.grid, grid, changedRows, changedCols)  # Find the stretch of each changed row whose links can change
+        colStretches = self.stretches(self.grid.T, grid.T, changedCols, changedRows)  # Find the stretch of each changed column whose links can change
+        engine = self.engine  # Get the engine
+        nodes = engine.nodes  # Get the node group
+        pellets = engine.pellets  # Get the pellet group
+        self.unindexStretches(rowStretches, colStretches)  # Forget the pellets on every edge about to be relinked
+        oldEdges = self.stretchEdges(rowStretches, colStretches)  # Get the edges that may be about to change
+        removedNodes = []  # Create an empty list of nodes removed
+        addedNodes = []  # Create an empty list of nodes added
+        oldNodes = nodeMask(self.grid[changedRows, changedCols]).tolist()  # Get which changed cells held nodes
+        newNodes = nodeMask(grid[changedRows, changedCols]).tolist()  # Get which changed cells hold nodes now
+        kinds = pelletKinds(grid[changedRows, changedCols]).tolist()  # Get the pellet type each changed cell holds now
+        changedRows, changedCols = changedRows.tolist(), changedCols.tolist()  # Get the changed cells as lists
+        for row, col, wasNode, isNode in zip(changedRows, changedCols, oldNodes, newNodes):  # Iterate through each changed cell
+            if wasNode and not isNode:  # If a node was erased
+                removedNodes.append(nodes.removeNode(col, row))  # Remove it
+            elif isNode and not wasNode:  # If a node was drawn
+                addedNodes.append(nodes.addNode(col, row))  # Add it
+        removedPellets, addedPellets = pellets.patchTiles(list(zip(changedCols, changedRows, kinds)))  # Add, keep or remove the pellet on each changed tile
+        for row, first, last in rowStretches:  # Iterate through each changed row
+            nodes.relinkRow(grid, row, first, last)  # Relink the horizontal edges of its stretch
+        for col, first, last in colStretches:  # Iterate through each changed column
+            nodes.relinkColumn(grid, col, first, last)  # Relink the vertical edges of its stretch
+        for pair1, pair2 in engine.portals:  # Iterate through each portal pair
+            nodes.setPortalPair(pair1, pair2)  # Restore it in case one end was redrawn
+        self.grid = grid  # Keep the new symbols
+        self.indexStretches(rowStretches, colStretches)  # Sort the pellets on every relinked edge
+        newEdges = self.stretchEdges(rowStretches, colStretches)  # Get the edges after relinking
+        self.placePacman()  # Keep Pacman on the same spot or the nearest node
+        self.resetInitialState()  # Make a new game start on the patched maze
+        self.reloads += 1  # Count the reload
+        patch = {"removedEdges": oldEdges - newEdges, "addedEdges": newEdges - oldEdges, "removedNodes": removedNodes,
+                 "addedNodes": addedNodes, "removedPellets": removedPellets, "addedPellets": addedPellets}  # Describe what changed for the renderer
+        return {"cells": len(changedRows), "rows": len(rowStretches), "cols": len(colStretches),
+                "seconds": time.perf_counter() - start, "patch": patch}  # Report the patch
+
+    def stretches(self, old, new, lines, cells):  # Define the method to find, for each changed line, the nodes bounding the changes on it
+        found = []  # Create an empty list of (line, first, last) stretches
+        order = np.lexsort((cells, lines))  # Sort the changes by line, then by position along it
+        lines, cells = lines[order].tolist(), cells[order].tolist()  # Get the sorted changes
+        i = 0  # Initialize the index of the first change on the current line
+        while i < len(lines):  # Iterate through each changed line
+            j = i  # Find the last change on the line
+            while j + 1 < len(lines) and lines[j + 1] == lines[i]:  # While the next change is on the same line
+                j += 1  # Include it
+            line, low, high = lines[i], cells[i], cells[j]  # Get the line and the span of its changes
+            isNode = nodeMask(old[line]) | nodeMask(new[line])  # Find the cells holding a node before or after, which agree outside the changes
+            before = np.nonzero(isNode[:low])[0]  # Find the nodes before the changes
+            after = np.nonzero(isNode[high + 1:])[0]  # Find the nodes after the changes
+            first = int(before[-1]) if len(before) else -1  # Get the last node before them, or just before the line
+            last = int(after[0]) + high + 1 if len(after) else len(isNode)  # Get the first node after them, or just past the line
+            found.append((line, first, last))  # Add the stretch
+            i = j + 1  # Move on to the next line
+        return found  # Return the stretches
+
+    def stretchNodes(self, rowStretches, colStretches):  # Define the method to yield each node in some stretches with the directions whose edges lie inside
+        nodes = self.engine.nodes  # Get the node group
+        for row, first, last in rowStretches:  # Iterate through each row stretch
+            offset = max(first, 0)  # Get where the stretch starts
+            for col in (np.nonzero(nodeMask(self.grid[row, offset:last + 1]))[0] + offset).tolist():  # Iterate through each node on the stretch
+                yield nodes.getNodeFromTiles(col, row), (RIGHT,) if col == first else (LEFT,) if col == last else (LEFT, RIGHT)  # Yield it with its inward directions
+        for col, first, last in colStretches:  # Iterate through each column stretch
+            offset = max(first, 0)  # Get where the stretch starts
+            for row in (np.nonzero(nodeMask(self.grid[offset:last + 1, col]))[0] + offset).tolist():  # Iterate through each node on the stretch
+                yield nodes.getNodeFromTiles(col, row), (DOWN,) if row == first else (UP,) if row == last else (UP, DOWN)  # Yield it with its inward directions
+
+    def stretchEdges(self, rowStretches, colStretches):  # Define the method to get every edge inside some stretches, plus the portals
+        edges = set()  # Create an empty set of edges, each stored once with its endpoints in order
+        for node, directions in self.stretchNodes(rowStretches, colStretches):  # Iterate through each node on the stretches
+            for direction in directions:  # Iterate through each direction inside the stretch
+                neighbor = node.neighbors[direction]  # Get the neighbor
+                if neighbor is not None:  # If there is an edge
+                    edges.add((node, neighbor) if node.position.asTuple() < neighbor.position.asTuple() else (neighbor, node))  # Add it once
+        for pair1, pair2 in self.engine.portals:  # Iterate through each portal pair, whose ends may have been redrawn
+            node = self.engine.nodes.getNodeFromTiles(*pair1)  # Get the node on the first end
+            if node is not None and node.neighbors[PORTAL] is not None:  # If the portal is open
+                edges.add((node, node.neighbors[PORTAL]))  # Add it
+        return edges  # Return the edges
+
+    def unindexStretches(self, rowStretches, colStretches):  # Define the method to forget the sorted pellets on every edge inside some stretches
+        edgeLUT = self.engine.pellets.edgeLUT  # Get the edge index
+        for node, directions in self.stretchNodes(rowStretches, colStretches):  # Iterate through each node on the stretches
+            for direction in directions:  # Iterate through each direction inside the stretch
+                edgeLUT.pop((node, node.neighbors[direction]), None)  # Forget the edge leaving the node
+
+    def indexStretches(self, rowStretches, colStretches):  # Define the method to sort the pellets on every edge inside some stretches
+        pellets = self.engine.pellets  # Get the pellet group
+        for node, directions in self.stretchNodes(rowStretches, colStretches):  # Iterate through each node on the stretches
+            for direction in directions:  # Iterate through each direction inside the stretch
+                neighbor = node.neighbors[direction]  # Get the neighbor
+                if neighbor is not None:  # If there is an edge
+                    pellets.indexEdge(node, neighbor)  # Sort the pellets on it
+
+    def rebuild(self, grid):  # Define the method to rebuild the nodes and pellets when the maze changed size
+        engine = self.engine  # Get the engine
+        maze = compileGrid(grid)  # Compile the new grid
+        engine.nodes = NodeGroup(engine.level, maze)  # Build the new nodes
+        for pair1, pair2 in engine.portals:  # Iterate through each portal pair
+            engine.nodes.setPortalPair(pair1, pair2)  # Set the portal pair in the maze
+        engine.pellets = PelletGroup(engine.level, maze)  # Build the new pellets
+        engine.pellets.indexEdges(engine.nodes)  # Sort the pellets along each maze edge
+        self.grid = grid  # Keep the new symbols
+        self.placePacman()  # Move Pacman onto the new nodes
+        self.resetInitialState()  # Make a new game start on the new maze
+        self.reloads += 1  # Count the reload
+
+    def placePacman(self):  # Define the method to keep Pacman on an equivalent node after the maze changed
+        nodes = self.engine.nodes  # Get the node group
+        pacman = self.engine.pacman  # Get Pacman
+        node = nodes.getNodeFromPixels(*pacman.node.position.asTuple())  # Get the node now on Pacman's node's tile
+        target = nodes.getNodeFromPixels(*pacman.target.position.asTuple())  # Get the node now on Pacman's target's tile
+        if node is not None and target is not None:  # If both ends of Pacman's edge survived
+            if target is node:  # If Pacman is waiting on a node
+                pacman.node = pacman.target = node  # Keep Pacman on it
+                return  # Keep the position
+            travelled = pacman.position.distanceSquared(node.position)  # Get how far along the edge Pacman is
+            step = node  # Start walking the edge from its first end, since new nodes may have split it
+            while step is not target:  # Walk until the far end
+                following = step.neighbors.get(pacman.direction)  # Get the next node along the edge
+                if following is None:  # If a wall now cuts the edge
+                    break  # Give up on the edge
+                if following.position.distanceSquared(node.position) >= travelled:  # If Pacman lies before the next node
+                    pacman.node = step  # Keep Pacman on the piece of the edge it is on
+                    pacman.target = following  # Head for the end of that piece
+                    return  # Keep the position and direction
+                step = following  # Move on to the next piece
+        candidates = [n for n in (node, target) if n is not None]  # Get the ends of the edge that survived
+        if not candidates:  # If neither survived
+            candidates = nodes.nodesLUT.values()  # Search every node
+        nearest = min(candidates, key=lambda n: n.position.distanceSquared(pacman.position))  # Find the closest node
+        pacman.node = nearest  # Put Pacman on it
+        pacman.target = nearest  # Wait at the node for input
+        pacman.direction = STOP  # Stop Pacman
+        pacman.setPosition()  # Set the position to the node's position
+        pacman.previousPosition.copyFrom(pacman.position)  # Do not interpolate across the jump
+
+    def resetInitialState(self):  # Define the method to rebuild the state a new game starts from
+        engine = self.engine  # Get the engine
+        start = engine.initialState["pacman"][0]  # Get the key of the node games started on
+        if engine.nodes.getNodeFromPixels(*start) is None:  # If the start node was erased
+            start = engine.nodes.getStartTempNode().position.asTuple()  # Start on the first node instead
+        pellets = engine.pellets  # Get the pellet group
+        engine.initialState = {"ticks": 0, "score": 0, "pacman": (start, start, start, STOP),
+                               "pellets": (np.zeros(len(pellets.pellets), dtype=bool), 0, [(True, 0)] * len(pellets.powerpellets))}  # Describe a fresh game
+
+if __name__ == "__main__":  # If this module is run as the main program
+    from engine import GameEngine  # Import the GameEngine class from the engine module
+    from inputs import RandomInput  # Import the random input provider
+    parser = argparse.ArgumentParser(description="Run Pacman headless and reload the maze whenever its file changes")  # Create the argument parser
+    parser.add_argument("--maze", default="maze1.txt")  # Add the maze file option
+    parser.add_argument("--seed", type=int, default=0)  # Add the random seed option
+    args = parser.parse_args()  # Parse the command line
+    engine = GameEngine(args.maze, RandomInput(args.seed))  # Create the engine with random input
+    reloader = MazeReloader(engine)  # Watch the maze file
+    print("watching %s, press Ctrl+C to stop" % args.maze)  # Print the file being watched
+    while True:  # Run until interrupted
+        engine.step()  # Advance the simulation
+        report = reloader.poll()  # Reload the maze if it changed
+        if report is not None:  # If the maze was reloaded
+            print("reloaded %(cells)d cells on %(rows)d rows and %(cols)d columns in %(seconds).4fs" % report)  # Print the report
+        time.sleep(engine.dt)  # Run at roughly real time
@@ -0,0 +1,79 @@
+import random  # Import the random module for seeded random input
+import pygame  # Import the pygame module for keyboard polling
+from pygame.locals import *  # Import all constants from pygame.locals
+from constants import *  # Import all constants from the constants module
+
+KEYDIRECTIONS = [(K_UP, UP), (K_DOWN, DOWN), (K_LEFT, LEFT), (K_RIGHT, RIGHT)]  # Define the arrow keys in priority order
+
+class KeyboardInput(object):  # Define an input provider that polls the live keyboard
+    def getDirection(self, pacman):  # Define the method to get the direction for this tick
+        key_pressed = pygame.key.get_pressed()  # Get the state of all keyboard keys
+        for key, direction in KEYDIRECTIONS:  # Iterate through each arrow key
+            if key_pressed[key]:  # If the key is pressed
+                return direction  # Return its direction
+        return STOP  # Return stop if no direction key is pressed
+
+class BufferedKeyboardInput(KeyboardInput):  # Define a keyboard provider that also remembers taps until the next node
+    def __init__(self):  # Initialize with an empty turn queue
+        self.queued = STOP  # Initialize the direction waiting to be taken
+        self.queuedAt = None  # Initialize the node Pacman had left when the turn was first offered
+
+    def handleEvent(self, event):  # Define the method to buffer arrow key presses from the event queue
+        if event.type == KEYDOWN:  # If a key went down
+            for key, direction in KEYDIRECTIONS:  # Iterate through each arrow key
+                if event.key == key:  # If it is this arrow key
+                    self.queued = direction  # Queue the turn
+                    self.queuedAt = None  # Offer it from Pacman's current edge
+
+    def getDirection(self, pacman):  # Define the method to get the direction for this tick
+        if self.queued != STOP:  # If a turn is waiting
+            if self.queuedAt is None:  # If the turn has not been offered yet
+                self.queuedAt = pacman.node  # Remember the edge it was first offered on
+            elif pacman.direction == self.queued or pacman.node is not self.queuedAt or pacman.target is pacman.node:  # If Pacman took it, passed the next node or is standing where it cannot turn
+                self.queued = STOP  # Drop the turn
+        if self.queued != STOP:  # If a turn is still waiting
+            return self.queued  # Offer it again
+        return KeyboardInput.getDirection(self, pacman)  # Otherwise use the keys held down
+
+class ScriptedInput(object):  # Define an input provider that plays back a fixed list of directions
+    def __init__(self, script, loop=False):  # Initialize with one direction per tick
+        self.script = list(script)  # Store the directions as a list
+        self.loop = loop  # Set whether the script restarts when it runs out
+        self.tick = 0  # Initialize the index of the next direction
+
+    @classmethod
+    def fromRuns(cls, runs, loop=False):  # Define a constructor from (direction, ticks) pairs
+        script = []  # Create an empty list of directions
+        for direction, ticks in runs:  # Iterate through each run
+            script.extend([direction] * ticks)  # Repeat the direction for the length of the run
+        return cls(script, loop)  # Return the scripted input
+
+    def getDirection(self, pacman):  # Define the method to get the direction for this tick
+        if self.tick >= len(self.script):  # If the script has run out
+            if not self.loop or len(self.script) == 0:  # If the script does not loop
+                return STOP  # Return stop once the script is finished
+            self.tick = 0  # Restart the script from the beginning
+        direction = self.script[self.tick]  # Get the direction for this tick
+        self.tick += 1  # Move on to the next tick
+        return direction  # Return the direction
+
+class AgentInput(object):  # Define an input provider driven by a policy function
+    def __init__(self, policy):  # Initialize with a callable taking Pacman and returning a direction
+        self.policy = policy  # Store the policy
+
+    def getDirection(self, pacman):  # Define the method to get the direction for this tick
+        return self.policy(pacman)  # Ask the policy for a direction
+
+class RandomInput(object):  # Define an input provider that picks seeded random directions
+    def __init__(self, seed=None, holdTicks=15):  # Initialize with a seed and how long to hold each choice
+        self.rng = random.Random(seed)  # Create a private random generator
+        self.holdTicks = holdTicks  # Set the number of ticks to hold a direction
+        self.direction = STOP  # Initialize the held direction
+        self.remaining = 0  # Initialize the ticks left on the held direction
+
+    def getDirection(self, pacman):  # Define the method to get the direction for this tick
+        if self.remaining <= 0:  # If the held direction has expired
+            self.direction = self.rng.choice([UP, DOWN, LEFT, RIGHT])  # Pick a new random direction
+            self.remaining = self.holdTicks  # Reset the hold counter
+        self.remaining -= 1  # Count down the hold
+        return self.direction  # Return the held direction
@@ -0,0 +1,120 @@
+import os  # Import the os module for cache file paths
+import hashlib  # Import the hashlib module for hashing maze files
+import numpy as np  # Import the numpy module for numerical operations
+from constants import *  # Import all constants from the constants module
+
+COMPILERVERSION = b"1"  # Define the version mixed into cache keys so old caches are ignored
+CACHEDIR = ".mazecache"  # Define the name of the directory holding compiled mazes
+NODESYMBOLS = b"+Pn"  # Define symbols representing nodes
+PATHSYMBOLS = b".-|p"  # Define symbols representing paths
+PELLETSYMBOLS = b".+"  # Define symbols representing regular pellets
+POWERPELLETSYMBOLS = b"Pp"  # Define symbols representing power pellets
+NOTHING = -1  # Define the index used for a missing neighbor
+NEIGHBORDIRECTIONS = [UP, DOWN, LEFT, RIGHT]  # Define the direction of each column in the neighbor table
+
+_compiled = {}  # Initialize the in-process table of compiled mazes by hash
+
+def saveCacheFile(path, save, *args, **kwargs):  # Define the function to write a cache file with a numpy save function so readers never see a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)  # Make sure the cache directory exists
+    temp = "%s.%d.tmp" % (path, os.getpid())  # Build a private temporary file path
+    try:  # Try to write the file
+        with open(temp, "wb") as f:  # Open the temporary file
+            save(f, *args, **kwargs)  # Write the arrays
+        os.replace(temp, path)  # Move the finished file into place
+    except OSError:  # If the write failed
+        if os.path.exists(temp):  # If a partial temporary file was left
+            os.remove(temp)  # Delete it
+        raise  # Let the caller decide what to do
+
+class CompiledMaze(object):  # Define a class holding a maze as flat arrays
+    def __init__(self, grid, nodeTiles, neighbors, pelletTiles, pelletTypes, digest):  # Initialize the compiled maze
+        self.grid = grid  # Set the maze symbols as a (rows, cols) uint8 array
+        self.nodeTiles = nodeTiles  # Set the (col, row) tile of each node in row-major order
+        self.neighbors = neighbors  # Set the neighbor node index for each direction in NEIGHBORDIRECTIONS
+        self.pelletTiles = pelletTiles  # Set the (col, row) tile of each pellet in row-major order
+        self.pelletTypes = pelletTypes  # Set the type of each pellet
+        self.digest = digest  # Set the hash of the source file
+
+    def save(self, path):  # Define the method to write the compiled maze to disk
+        saveCacheFile(path, np.savez, grid=self.grid, nodeTiles=self.nodeTiles, neighbors=self.neighbors,
+                      pelletTiles=self.pelletTiles, pelletTypes=self.pelletTypes)  # Write every array into one file
+
+    @classmethod
+    def load(cls, path, digest):  # Define a constructor reading a compiled maze from disk
+        with np.load(path) as data:  # Open the compiled file
+            return cls(data["grid"], data["nodeTiles"], data["neighbors"],
+                       data["pelletTiles"], data["pelletTypes"], digest)  # Return the compiled maze
+
+def parseMaze(raw):  # Define the function to turn the maze text into a grid of symbols
+    lines = [line for line in raw.translate(None, b" \t\x0b\x0c").splitlines() if line]  # Drop the spaces between symbols and keep each non-empty line
+    symbols = b"".join(lines)  # Join every symbol into one byte string
+    return np.frombuffer(symbols, dtype=np.uint8).reshape(len(lines), -1)  # Return the symbols as a (rows, cols) array
+
+def linkRuns(order, rows, cols, segments, neighbors, forward, backward):  # Define the function to link consecutive nodes along one axis
+    a = order[:-1]  # Get every node but the last
+    b = order[1:]  # Get the node following each of them
+    same = (rows[a] == rows[b]) & (segments[rows[a], cols[a]] == segments[rows[b], cols[b]])  # Nodes link when no wall lies between them
+    neighbors[a[same], forward] = b[same]  # Link each node forward to the next one
+    neighbors[b[same], backward] = a[same]  # Link the next node back to each node
+
+def symbolTable(symbols, value=True, table=None):  # Define the function to build a lookup table from symbol bytes to a value
+    if table is None:  # If no table was given
+        table = np.zeros(256, dtype=type(value))  # Create a table with every symbol unset
+    table[np.frombuffer(symbols, dtype=np.uint8)] = value  # Set the value for each symbol
+    return table  # Return the table
+
+NODETABLE = symbolTable(NODESYMBOLS)  # Define whether each symbol is a node
+WALKABLETABLE = symbolTable(PATHSYMBOLS, True, NODETABLE.copy())  # Define whether each symbol can be walked through
+PELLETTABLE = symbolTable(POWERPELLETSYMBOLS, np.uint8(POWERPELLET), symbolTable(PELLETSYMBOLS, np.uint8(PELLET)))  # Define the pellet type of each symbol
+
+def nodeMask(cells):  # Define the function to find the node cells in an array of symbols
+    return NODETABLE[cells]  # Return True for every node cell
+
+def pelletKinds(cells):  # Define the function to get the pellet type of each cell in an array of symbols
+    return PELLETTABLE[cells]  # Return the type, or 0 for no pellet
+
+def lineLinks(line):  # Define the function to find the linked node pairs along one row or column of symbols
+    isNode = NODETABLE[line]  # Find the node cells
+    walls = ~WALKABLETABLE[line]  # Find the cells that break a connection
+    cells = np.nonzero(isNode)[0]  # Get the position of each node along the line
+    segments = np.cumsum(walls)[cells]  # Get the wall-free stretch each node sits in
+    same = segments[:-1] == segments[1:]  # Nodes link when no wall lies between them
+    return cells, cells[:-1][same], cells[1:][same]  # Return the node positions and each linked pair
+
+def compileGrid(grid, digest=None):  # Define the function to build nodes, links and pellets from a grid
+    isNode = NODETABLE[grid]  # Find the node cells
+    walls = ~WALKABLETABLE[grid]  # Find the cells that break a connection
+    rows, cols = np.nonzero(isNode)  # Get the tile of each node in row-major order
+    neighbors = np.full((len(rows), 4), NOTHING, dtype=np.int32)  # Initialize every neighbor as missing
+    order = np.arange(len(rows))  # Get the nodes in row-major order
+    linkRuns(order, rows, cols, np.cumsum(walls, axis=1), neighbors,
+             NEIGHBORDIRECTIONS.index(RIGHT), NEIGHBORDIRECTIONS.index(LEFT))  # Connect nodes horizontally
+    order = np.lexsort((rows, cols))  # Get the nodes in column-major order
+    linkRuns(order, cols, rows, np.cumsum(walls, axis=0).T, neighbors,
+             NEIGHBORDIRECTIONS.index(DOWN), NEIGHBORDIRECTIONS.index(UP))  # Connect nodes vertically
+    kinds = PELLETTABLE[grid]  # Get the pellet type of each cell, or 0 for no pellet
+    prows, pcols = np.nonzero(kinds)  # Get the tile of each pellet in row-major order
+    pelletTypes = kinds[prows, pcols]  # Get the type of each pellet
+    nodeTiles = np.stack([cols, rows], axis=1).astype(np.int32)  # Combine the node tiles into (col, row) pairs
+    pelletTiles = np.stack([pcols, prows], axis=1).astype(np.int32)  # Combine the pellet tiles into (col, row) pairs
+    return CompiledMaze(grid, nodeTiles, neighbors, pelletTiles, pelletTypes, digest)  # Return the compiled maze
+
+def loadMaze(textfile, useCache=True):  # Define the function to get a compiled maze for a text file, compiling it afresh if caching is off
+    with open(textfile, "rb") as f:  # Open the maze file
+        raw = f.read()  # Read the raw maze text
+    digest = hashlib.sha1(COMPILERVERSION + raw).hexdigest()  # Hash the maze text
+    if useCache and digest in _compiled:  # If the maze was already compiled in this process
+        return _compiled[digest]  # Return the compiled maze
+    cachefile = os.path.join(os.path.dirname(os.path.abspath(textfile)), CACHEDIR, digest + ".npz")  # Build the cache file path
+    if useCache and os.path.exists(cachefile):  # If a compiled copy exists on disk
+        maze = CompiledMaze.load(cachefile, digest)  # Load the compiled copy
+    else:  # Otherwise
+        maze = compileGrid(parseMaze(raw), digest)  # Parse and compile the maze text
+        if useCache:  # If caching is enabled
+            try:  # Try to cache the compiled maze
+                maze.save(cachefile)  # Write the compiled maze to disk
+            except OSError:  # If the directory cannot be written
+                pass  # Use the maze uncached, since the cache only saves time
+    if useCache:  # If caching is enabled
+        _compiled[digest] = maze  # Remember the compiled maze for this process
+    return maze  # Return the compiled maze
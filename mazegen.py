@@ -0,0 +1,52 @@
+import argparse  # Import the argparse module for the command line interface
+import random  # Import the random module for seeded generation
+
+def generateMaze(cols, rows, seed=0, loops=0.1, spacing=3):  # Define the function to build a random maze as text
+    rng = random.Random(seed)  # Create a private random generator
+    width = (cols - 1) * spacing + 3  # Get the width in tiles including the border
+    height = (rows - 1) * spacing + 3  # Get the height in tiles including the border
+    grid = [["X"] * width for _ in range(height)]  # Start with a grid of walls
+    for r in range(rows):  # Iterate through each lattice row
+        for c in range(cols):  # Iterate through each lattice column
+            grid[1 + r * spacing][1 + c * spacing] = "+"  # Place a node at the lattice point
+    for c, r in [(0, 0), (cols - 1, 0), (0, rows - 1), (cols - 1, rows - 1)]:  # Iterate through the four corners
+        grid[1 + r * spacing][1 + c * spacing] = "P"  # Place a power pellet node in the corner
+    visited = {(0, 0)}  # Mark the first lattice point as visited
+    stack = [(0, 0)]  # Start the depth-first search at the first lattice point
+    edges = set()  # Initialize the carved corridors
+    while stack:  # Run until every reachable point is visited
+        c, r = stack[-1]  # Get the current lattice point
+        options = [(c + dc, r + dr) for dc, dr in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= c + dc < cols and 0 <= r + dr < rows and (c + dc, r + dr) not in visited]  # Find unvisited neighbors
+        if not options:  # If there is nowhere new to go
+            stack.pop()  # Backtrack
+            continue  # Try the previous point
+        nxt = rng.choice(options)  # Pick a random unvisited neighbor
+        edges.add(frozenset([(c, r), nxt]))  # Carve a corridor to it
+        visited.add(nxt)  # Mark it as visited
+        stack.append(nxt)  # Continue from it
+    for r in range(rows):  # Iterate through each lattice row
+        for c in range(cols):  # Iterate through each lattice column
+            for nxt in ((c + 1, r), (c, r + 1)):  # Iterate through the right and down neighbors
+                if nxt[0] < cols and nxt[1] < rows and rng.random() < loops:  # If the neighbor exists and a loop is wanted
+                    edges.add(frozenset([(c, r), nxt]))  # Carve an extra corridor
+    for edge in edges:  # Iterate through each corridor
+        (c1, r1), (c2, r2) = sorted(edge)  # Get its two ends in order
+        for i in range(1, spacing):  # Iterate through the tiles between the ends
+            grid[1 + r1 * spacing + (r2 - r1) * i][1 + c1 * spacing + (c2 - c1) * i] = "."  # Fill the tile with a pellet path
+    return "\n".join(" ".join(row) for row in grid) + "\n"  # Return the maze in the text file format
+
+def writeMaze(path, cols, rows, seed=0, loops=0.1):  # Define the function to write a random maze file
+    with open(path, "w") as f:  # Open the output file
+        f.write(generateMaze(cols, rows, seed, loops))  # Write the generated maze
+    return path  # Return the file path
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Generate a random Pacman maze")  # Create the argument parser
+    parser.add_argument("path")  # Add the output file argument
+    parser.add_argument("--cols", type=int, default=40)  # Add the number of lattice columns option
+    parser.add_argument("--rows", type=int, default=40)  # Add the number of lattice rows option
+    parser.add_argument("--seed", type=int, default=0)  # Add the random seed option
+    parser.add_argument("--loops", type=float, default=0.1)  # Add the extra corridor probability option
+    args = parser.parse_args()  # Parse the command line
+    writeMaze(args.path, args.cols, args.rows, args.seed, args.loops)  # Write the maze
@@ -1,75 +1,92 @@
 import pygame  # Import the pygame module for game development
 from vector import Vector2  # Import the Vector2 class from the vector module
 from constants import *  # Import all constants from the constants module
-import numpy as np  # Import the numpy module for numerical operations
+from mazecompiler import loadMaze, lineLinks, NEIGHBORDIRECTIONS, NOTHING  # Import the maze compiler
 
 class Node(object):  # Define a class for a node in the maze
+    __slots__ = ("position", "neighbors")  # Store only the node's fields
     def __init__(self, x, y):  # Initialize the node with x and y coordinates
         self.position = Vector2(x, y)  # Set the position of the node as a Vector2 object
         self.neighbors = {UP: None, DOWN: None, LEFT: None, RIGHT: None, PORTAL: None}  # Initialize neighbor nodes
 
-    def render(self, screen):  # Define the method to render the node on the screen
+    def render(self, screen, offset=(0, 0)):  # Define the method to render the node on the screen shifted by a camera offset
         for n in self.neighbors.keys():  # Iterate through each neighbor direction
             if self.neighbors[n] is not None:  # If the neighbor exists
-                line_start = self.position.asTuple()  # Get the start position of the line
-                line_end = self.neighbors[n].position.asTuple()  # Get the end position of the line
-                pygame.draw.line(screen, WHITE, line_start, line_end, 4)  # Draw the line between nodes
-        pygame.draw.circle(screen, RED, self.position.asInt(), 12)  # Draw the node as a red circle
+                self.renderEdge(screen, self.neighbors[n], offset)  # Draw the line to the neighbor
+        self.renderNode(screen, offset)  # Draw the node itself
+
+    def renderEdge(self, screen, neighbor, offset=(0, 0)):  # Define the method to render the line to one neighbor
+        line_start = (self.position.x - offset[0], self.position.y - offset[1])  # Get the start position of the line
+        line_end = (neighbor.position.x - offset[0], neighbor.position.y - offset[1])  # Get the end position of the line
+        pygame.draw.line(screen, WHITE, line_start, line_end, 4)  # Draw the line between nodes
+
+    def renderNode(self, screen, offset=(0, 0)):  # Define the method to render the node's circle
+        x, y = self.position.asInt()  # Get the integer position of the node
+        pygame.draw.circle(screen, RED, (x - offset[0], y - offset[1]), 12)  # Draw the node as a red circle
 
 class NodeGroup(object):  # Define a class for a group of nodes
-    def __init__(self, level):  # Initialize the node group with a level file
+    def __init__(self, level, maze=None):  # Initialize the node group with a level file or an already compiled maze
         self.level = level  # Set the level file
         self.nodesLUT = {}  # Initialize a lookup table for nodes
-        self.nodeSymbols = ['+', 'P', 'n']  # Define symbols representing nodes
-        self.pathSymbols = ['.', '-', '|', 'p']  # Define symbols representing paths
-        data = self.readMazeFile(level)  # Read the maze file data
-        self.createNodeTable(data)  # Create the node table from the data
-        self.connectHorizontally(data)  # Connect nodes horizontally
-        self.connectVertically(data)  # Connect nodes vertically
-
-    def readMazeFile(self, textfile):  # Define the method to read the maze file
-        return np.loadtxt(textfile, dtype='<U1')  # Load the file into a numpy array of strings
-
-    def createNodeTable(self, data, xoffset=0, yoffset=0):  # Define the method to create the node table
-        for row in list(range(data.shape[0])):  # Iterate through each row in the data
-            for col in list(range(data.shape[1])):  # Iterate through each column in the data
-                if data[row][col] in self.nodeSymbols:  # If the cell contains a node symbol
-                    x, y = self.constructKey(col + xoffset, row + yoffset)  # Construct the key for the node
-                    self.nodesLUT[(x, y)] = Node(x, y)  # Add the node to the lookup table
+        if maze is None:  # If no compiled maze was given
+            maze = loadMaze(level)  # Get the compiled maze for the level file
+        self.maze = maze  # Set the compiled maze
+        nodeList = self.createNodeTable(self.maze)  # Create the node table from the compiled maze
+        self.connectNodes(self.maze, nodeList)  # Connect nodes using the compiled neighbor table
+
+    def createNodeTable(self, maze, xoffset=0, yoffset=0):  # Define the method to create the node table
+        nodeList = []  # Initialize the nodes in compiled index order
+        for col, row in maze.nodeTiles.tolist():  # Iterate through the tile of each node
+            x, y = self.constructKey(col + xoffset, row + yoffset)  # Construct the key for the node
+            node = Node(x, y)  # Create the node
+            self.nodesLUT[(x, y)] = node  # Add the node to the lookup table
+            nodeList.append(node)  # Add the node to the index order
+        return nodeList  # Return the nodes in compiled index order for linking
 
     def constructKey(self, x, y):  # Define the method to construct a key from x and y coordinates
         return x * TILEWIDTH, y * TILEHEIGHT  # Return the coordinates multiplied by tile dimensions
 
-    def connectHorizontally(self, data, xoffset=0, yoffset=0):  # Define the method to connect nodes horizontally
-        for row in list(range(data.shape[0])):  # Iterate through each row in the data
-            key = None  # Initialize the key to None
-            for col in list(range(data.shape[1])):  # Iterate through each column in the data
-                if data[row][col] in self.nodeSymbols:  # If the cell contains a node symbol
-                    if key is None:  # If no key is set
-                        key = self.constructKey(col + xoffset, row + yoffset)  # Set the key to the current node
-                    else:  # If a key is already set
-                        otherkey = self.constructKey(col + xoffset, row + yoffset)  # Set the other key to the current node
-                        self.nodesLUT[key].neighbors[RIGHT] = self.nodesLUT[otherkey]  # Connect right neighbor
-                        self.nodesLUT[otherkey].neighbors[LEFT] = self.nodesLUT[key]  # Connect left neighbor
-                        key = otherkey  # Update the key to the current node
-                elif data[row][col] not in self.pathSymbols:  # If the cell is not a path symbol
-                    key = None  # Reset the key to None
-
-    def connectVertically(self, data, xoffset=0, yoffset=0):  # Define the method to connect nodes vertically
-        dataT = data.transpose()  # Transpose the data for vertical connection
-        for col in list(range(dataT.shape[0])):  # Iterate through each column in the transposed data
-            key = None  # Initialize the key to None
-            for row in list(range(dataT.shape[1])):  # Iterate through each row in the transposed data
-                if dataT[col][row] in self.nodeSymbols:  # If the cell contains a node symbol
-                    if key is None:  # If no key is set
-                        key = self.constructKey(col + xoffset, row + yoffset)  # Set the key to the current node
-                    else:  # If a key is already set
-                        otherkey = self.constructKey(col + xoffset, row + yoffset)  # Set the other key to the current node
-                        self.nodesLUT[key].neighbors[DOWN] = self.nodesLUT[otherkey]  # Connect down neighbor
-                        self.nodesLUT[otherkey].neighbors[UP] = self.nodesLUT[key]  # Connect up neighbor
-                        key = otherkey  # Update the key to the current node
-                elif dataT[col][row] not in self.pathSymbols:  # If the cell is not a path symbol
-                    key = None  # Reset the key to None
+    def connectNodes(self, maze, nodeList):  # Define the method to link nodes from the compiled neighbor table
+        for node, links in zip(nodeList, maze.neighbors.tolist()):  # Iterate through each node and its neighbor indices
+            for direction, index in zip(NEIGHBORDIRECTIONS, links):  # Iterate through each direction
+                if index != NOTHING:  # If there is a neighbor in that direction
+                    node.neighbors[direction] = nodeList[index]  # Connect the neighbor
+
+    def addNode(self, col, row):  # Define the method to add an unlinked node on a tile
+        x, y = self.constructKey(col, row)  # Construct the key for the node
+        node = Node(x, y)  # Create the node
+        self.nodesLUT[(x, y)] = node  # Add the node to the lookup table
+        return node  # Return the new node
+
+    def removeNode(self, col, row):  # Define the method to remove the node on a tile
+        node = self.nodesLUT.pop(self.constructKey(col, row))  # Remove the node from the lookup table
+        portal = node.neighbors[PORTAL]  # Get the node's portal partner
+        if portal is not None and portal.neighbors[PORTAL] is node:  # If the partner leads back to the node
+            portal.neighbors[PORTAL] = None  # Close the portal
+        return node  # Return the removed node
+
+    def relinkLine(self, line, tileOf, forward, backward, first=-1, last=None):  # Define the method to relink the nodes along a stretch of one row or column of symbols
+        if last is None:  # If no end was given
+            last = len(line)  # Relink to the end of the line
+        offset = max(first, 0)  # Get where the stretch starts, first and last being its end nodes or just past the line
+        cells, starts, ends = lineLinks(line[offset:min(last, len(line) - 1) + 1])  # Find the nodes and linked pairs along the stretch
+        for cell in (cells + offset).tolist():  # Iterate through each node on the stretch
+            node = self.nodesLUT[self.constructKey(*tileOf(cell))]  # Get the node
+            if cell != last:  # If the node is not the far end, whose forward link lies outside the stretch
+                node.neighbors[forward] = None  # Forget its forward link
+            if cell != first:  # If the node is not the near end, whose backward link lies outside the stretch
+                node.neighbors[backward] = None  # Forget its backward link
+        for start, end in zip((starts + offset).tolist(), (ends + offset).tolist()):  # Iterate through each linked pair
+            first = self.nodesLUT[self.constructKey(*tileOf(start))]  # Get the first node
+            second = self.nodesLUT[self.constructKey(*tileOf(end))]  # Get the second node
+            first.neighbors[forward] = second  # Link the first node forward
+            second.neighbors[backward] = first  # Link the second node back
+
+    def relinkRow(self, grid, row, first=-1, last=None):  # Define the method to relink the horizontal edges of a stretch of one row
+        self.relinkLine(grid[row], lambda col: (col, row), RIGHT, LEFT, first, last)  # Relink left to right
+
+    def relinkColumn(self, grid, col, first=-1, last=None):  # Define the method to relink the vertical edges of a stretch of one column
+        self.relinkLine(grid[:, col], lambda row: (col, row), DOWN, UP, first, last)  # Relink top to bottom
 
     def getNodeFromPixels(self, xpixel, ypixel):  # Define the method to get a node from pixel coordinates
         if (xpixel, ypixel) in self.nodesLUT.keys():  # Check if the key exists in the lookup table
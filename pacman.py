@@ -1,10 +1,10 @@
 import pygame  # Import the pygame module for game development
-from pygame.locals import *  # Import all constants from pygame.locals
 from vector import Vector2  # Import the Vector2 class from the vector module
 from constants import *  # Import all constants from the constants module
+from inputs import KeyboardInput  # Import the default keyboard input provider
 
 class Pacman(object):  # Define a class for Pacman
-    def __init__(self, node):  # Initialize Pacman with a starting node
+    def __init__(self, node, inputProvider=None):  # Initialize Pacman with a starting node and an input provider
         self.name = PACMAN  # Set the name of the character to Pacman
         self.directions = {  # Define possible directions for Pacman
             STOP: Vector2(),  # No movement
@@ -18,20 +18,56 @@ class Pacman(object):  # Define a class for Pacman
         self.radius = 10  # Set the radius for rendering Pacman
         self.color = YELLOW  # Set the color of Pacman
         self.node = node  # Set the starting node
+        self.position = Vector2()  # Create the position vector that is updated in place
         self.setPosition()  # Set the initial position
+        self.previousPosition = self.position.copy()  # Initialize the position at the start of the last step
+        self.renderPosition = self.position.copy()  # Initialize the position drawn between simulation steps
         self.target = node  # Set the initial target node
         self.collideRadius = 5  # Set the collision radius
+        self.sweepNodes = []  # Initialize the node each edge span swept in the last step starts from, reused every step
+        self.sweepTargets = []  # Initialize the target node of each edge span swept
+        self.sweepStarts = []  # Initialize the distance from the node where each edge span starts
+        self.sweepEnds = []  # Initialize the distance from the node where each edge span ends
+        self.numSweeps = 0  # Initialize the number of edge spans swept in the last step
+        if inputProvider is None:  # If no input provider was given
+            inputProvider = KeyboardInput()  # Fall back to the live keyboard
+        self.inputProvider = inputProvider  # Set the source of direction input
+
+    def getState(self):  # Define a method to capture Pacman's movement state
+        return self.node.position.asTuple(), self.target.position.asTuple(), self.position.asTuple(), self.direction  # Return the node keys, position and direction
+
+    def setState(self, state, nodes):  # Define a method to restore a captured movement state
+        nodeKey, targetKey, position, direction = state  # Unpack the captured state
+        self.node = nodes.getNodeFromPixels(*nodeKey)  # Restore the current node
+        self.target = nodes.getNodeFromPixels(*targetKey)  # Restore the target node
+        self.position.x, self.position.y = position  # Restore the position in place
+        self.previousPosition.copyFrom(self.position)  # Do not interpolate across the jump
+        self.direction = direction  # Restore the direction
 
     def setPosition(self):  # Define a method to set Pacman's position
-        self.position = self.node.position.copy()  # Copy the node's position
+        self.position.copyFrom(self.node.position)  # Copy the node's position in place
 
-    def update(self, dt):  # Define a method to update Pacman's state
-        self.position += self.directions[self.direction] * self.speed * dt  # Update the position based on direction and speed
-        direction = self.getValidKey()  # Get the direction from the key press
-        if self.overshotTarget():  # Check if Pacman has overshot the target node
+    def update(self, dt):  # Define a method to update Pacman's state by sweeping along the maze edges
+        self.previousPosition.copyFrom(self.position)  # Remember where the step started for interpolation
+        direction = self.getValidKey()  # Get the direction from the input provider
+        if self.oppositeDirection(direction):  # Check if the new direction is opposite
+            self.reverseDirection()  # Reverse the direction
+        remaining = self.speed * dt  # Get the distance to travel this step
+        self.numSweeps = 0  # Forget the edge spans swept last step
+        while True:  # Keep moving until the distance is used up or Pacman stops
+            toTarget = self.position.distanceSquared(self.target.position) ** 0.5  # Get the distance left to the target node
+            travel = min(remaining, toTarget)  # Move no further than the target node
+            if travel > 0:  # If Pacman moves along the edge
+                start = self.position.distanceSquared(self.node.position) ** 0.5  # Get the distance already covered from the node
+                self.recordSweep(start, start + travel)  # Record the span of the edge swept
+                self.position.addScaled(self.directions[self.direction], travel)  # Update the position in place
+                remaining -= travel  # Use up the distance traveled
+            if travel < toTarget:  # If the target node was not reached
+                break  # The step ends on the edge
             self.node = self.target  # Set the current node to the target
             if self.node.neighbors[PORTAL] is not None:  # Check for portal
                 self.node = self.node.neighbors[PORTAL]  # Move to the portal node
+                self.previousPosition.copyFrom(self.node.position)  # Interpolate from the portal exit, not across the maze
             self.target = self.getNewTarget(direction)  # Get the new target node based on direction
             if self.target is not self.node:  # If the target is not the current node
                 self.direction = direction  # Update the direction
@@ -40,9 +76,21 @@ class Pacman(object):  # Define a class for Pacman
             if self.target is self.node:  # If the target is still the current node
                 self.direction = STOP  # Stop the movement
             self.setPosition()  # Set the position to the node's position
-        else:  # If Pacman hasn't overshot the target
-            if self.oppositeDirection(direction):  # Check if the new direction is opposite
-                self.reverseDirection()  # Reverse the direction
+            if self.direction == STOP or remaining <= 0:  # If Pacman stopped or has no distance left
+                break  # The step ends on the node
+
+    def recordSweep(self, start, end):  # Define a method to record an edge span swept, reusing the buffers from earlier steps
+        i = self.numSweeps  # Get the slot for the span
+        if i == len(self.sweepNodes):  # If every slot is in use
+            self.sweepNodes.append(None)  # Add a node slot
+            self.sweepTargets.append(None)  # Add a target slot
+            self.sweepStarts.append(0.0)  # Add a start slot
+            self.sweepEnds.append(0.0)  # Add an end slot
+        self.sweepNodes[i] = self.node  # Record the node
+        self.sweepTargets[i] = self.target  # Record the target
+        self.sweepStarts[i] = start  # Record the start distance
+        self.sweepEnds[i] = end  # Record the end distance
+        self.numSweeps = i + 1  # Count the span
 
     def validDirection(self, direction):  # Define a method to check if a direction is valid
         if direction is not STOP:  # If the direction is not stop
@@ -55,26 +103,8 @@ class Pacman(object):  # Define a class for Pacman
             return self.node.neighbors[direction]  # Return the neighboring node in that direction
         return self.node  # Return the current node if the direction is not valid
 
-    def getValidKey(self):  # Define a method to get the direction from key press
-        key_pressed = pygame.key.get_pressed()  # Get the state of all keyboard keys
-        if key_pressed[K_UP]:  # If the up key is pressed
-            return UP  # Return the up direction
-        if key_pressed[K_DOWN]:  # If the down key is pressed
-            return DOWN  # Return the down direction
-        if key_pressed[K_LEFT]:  # If the left key is pressed
-            return LEFT  # Return the left direction
-        if key_pressed[K_RIGHT]:  # If the right key is pressed
-            return RIGHT  # Return the right direction
-        return STOP  # Return stop if no direction key is pressed
-
-    def overshotTarget(self):  # Define a method to check if Pacman has overshot the target
-        if self.target is not None:  # If the target is not None
-            vec1 = self.target.position - self.node.position  # Vector from current node to target
-            vec2 = self.position - self.node.position  # Vector from current node to current position
-            node2Target = vec1.magnitudeSquared()  # Squared distance from current node to target
-            node2Self = vec2.magnitudeSquared()  # Squared distance from current node to current position
-            return node2Self >= node2Target  # Return True if current position is beyond or at target
-        return False  # Return False if no target
+    def getValidKey(self):  # Define a method to get the direction from the input provider
+        return self.inputProvider.getDirection(self)  # Ask the input provider for this tick's direction
 
     def reverseDirection(self):  # Define a method to reverse the direction
         self.direction *= -1  # Reverse the direction
@@ -88,15 +118,27 @@ class Pacman(object):  # Define a class for Pacman
                 return True  # Return True if opposite
         return False  # Return False if not opposite
 
-    def eatPellets(self, pelletList):  # Define a method for Pacman to eat pellets
-        for pellet in pelletList:  # Iterate through each pellet in the list
-            d = self.position - pellet.position  # Calculate the distance vector between Pacman and the pellet
-            dSquared = d.magnitudeSquared()  # Calculate the squared distance
+    def eatPellets(self, pellets):  # Define a method for Pacman to eat every pellet touched during the last step
+        eaten = []  # Create an empty list of pellets eaten
+        for i in range(self.numSweeps):  # Iterate through each edge span swept
+            for pellet in pellets.getPelletsAlong(self.sweepNodes[i], self.sweepTargets[i], self.sweepStarts[i], self.sweepEnds[i], self.collideRadius):  # Iterate through the pellets the span touches
+                if pellet not in eaten:  # If the pellet was not already touched
+                    eaten.append(pellet)  # Add it to the pellets eaten
+        for pellet in pellets.getPelletsNear(self.position):  # Iterate through the uneaten pellets on nearby tiles
+            dSquared = self.position.distanceSquared(pellet.position)  # Calculate the squared distance without a temporary vector
             rSquared = (pellet.radius + self.collideRadius) ** 2  # Calculate the squared collision radius
-            if dSquared <= rSquared:  # If the squared distance is within the collision radius
-                return pellet  # Return the pellet that has been eaten
-        return None  # Return None if no pellet is eaten
+            if dSquared <= rSquared and pellet not in eaten:  # If the squared distance is within the collision radius
+                eaten.append(pellet)  # Add the pellet to the pellets eaten
+        return eaten  # Return the pellets that have been eaten
+
+    def interpolate(self, alpha):  # Define a method to place Pacman between the last two simulation steps for drawing
+        self.renderPosition.x = self.previousPosition.x + (self.position.x - self.previousPosition.x) * alpha  # Blend the x coordinate
+        self.renderPosition.y = self.previousPosition.y + (self.position.y - self.previousPosition.y) * alpha  # Blend the y coordinate
+
+    def render(self, screen, offset=(0, 0)):  # Define a method to render Pacman on the screen shifted by a camera offset
+        x, y = self.renderPosition.asInt()  # Get the integer drawing position of Pacman
+        pygame.draw.circle(screen, self.color, (x - offset[0], y - offset[1]), self.radius)  # Draw Pacman as a circle on the screen
 
-    def render(self, screen):  # Define a method to render Pacman on the screen
-        p = self.position.asInt()  # Get the integer position of Pacman
-        pygame.draw.circle(screen, self.color, p, self.radius)  # Draw Pacman as a circle on the screen
+    def getRect(self):  # Define a method to get the screen area covered by Pacman
+        x, y = self.renderPosition.asInt()  # Get the integer drawing position of Pacman
+        return pygame.Rect(x - self.radius, y - self.radius, self.radius * 2 + 1, self.radius * 2 + 1)  # Return the bounding rectangle
@@ -0,0 +1,160 @@
+import os  # Import the os module for cache file paths
+import heapq  # Import the heapq module for the shortest path search
+import hashlib  # Import the hashlib module for hashing graphs
+import numpy as np  # Import the numpy module for numerical operations
+from constants import *  # Import all constants from the constants module
+from mazecompiler import CACHEDIR, saveCacheFile  # Import the cache directory name and writer
+
+PATHSVERSION = b"1"  # Define the version mixed into cache keys so old tables are ignored
+UNREACHABLE = -1  # Define the next hop used when there is no path
+WALKDIRECTIONS = (UP, DOWN, LEFT, RIGHT)  # Define the directions Pacman can move in, unlike PORTAL
+
+class MazeGraph(object):  # Define a class holding the node graph as compressed sparse row arrays
+    def __init__(self, nodes):  # Initialize the graph from a node group
+        self.nodeList = list(nodes.nodesLUT.values())  # Get the nodes in index order
+        self.index = {node: i for i, node in enumerate(self.nodeList)}  # Map each node to its index
+        indptr = [0]  # Initialize the offset of each node's first edge
+        indices = []  # Initialize the target node of each edge
+        weights = []  # Initialize the length of each edge in pixels
+        directions = []  # Initialize the direction of each edge
+        for node in self.nodeList:  # Iterate through each node
+            for direction, neighbor in node.neighbors.items():  # Iterate through each neighbor direction
+                if neighbor is not None:  # If the neighbor exists
+                    indices.append(self.index[neighbor])  # Add the neighbor as an edge target
+                    if direction == PORTAL:  # If the edge is a portal
+                        weights.append(0.0)  # Portals cost nothing to cross
+                    else:  # Otherwise
+                        weights.append((neighbor.position - node.position).magnitude())  # The edge costs its length
+                    directions.append(direction)  # Add the edge direction
+            indptr.append(len(indices))  # Close the node's edge range
+        self.indptr = np.array(indptr, dtype=np.int32)  # Store the edge offsets
+        self.indices = np.array(indices, dtype=np.int32)  # Store the edge targets
+        self.weights = np.array(weights, dtype=np.float32)  # Store the edge lengths
+        self.directions = np.array(directions, dtype=np.int8)  # Store the edge directions
+
+    def digest(self):  # Define the method to hash the graph for caching
+        sha = hashlib.sha1(PATHSVERSION)  # Start the hash with the table version
+        for array in (self.indptr, self.indices, self.weights):  # Iterate through the arrays that define distances
+            sha.update(array.tobytes())  # Add the array to the hash
+        return sha.hexdigest()  # Return the hash as text
+
+def shortestPaths(graph):  # Define the function to compute all-pairs distances and next hops
+    n = len(graph.nodeList)  # Get the number of nodes
+    indptr = graph.indptr.tolist()  # Get the edge offsets as a list
+    indices = graph.indices.tolist()  # Get the edge targets as a list
+    weights = graph.weights.tolist()  # Get the edge lengths as a list
+    dist = np.full((n, n), np.inf, dtype=np.float32)  # Initialize every distance as infinite
+    nexthop = np.full((n, n), UNREACHABLE, dtype=np.int32)  # Initialize every next hop as unreachable
+    for source in range(n):  # Iterate through each source node
+        d = [float("inf")] * n  # Initialize the distances from the source
+        first = [UNREACHABLE] * n  # Initialize the first hop toward each node
+        d[source] = 0.0  # The source is at distance zero
+        first[source] = source  # The source reaches itself without moving
+        heap = [(0.0, source)]  # Initialize the search frontier
+        while heap:  # Run until the frontier is empty
+            du, u = heapq.heappop(heap)  # Get the closest unfinished node
+            if du > d[u]:  # If a shorter path was already found
+                continue  # Skip the stale entry
+            for k in range(indptr[u], indptr[u + 1]):  # Iterate through each edge of the node
+                v = indices[k]  # Get the edge target
+                nd = du + weights[k]  # Get the distance through this edge
+                if nd < d[v]:  # If the path is shorter
+                    d[v] = nd  # Record the new distance
+                    first[v] = v if u == source else first[u]  # Record the first hop on the path
+                    heapq.heappush(heap, (nd, v))  # Add the node to the frontier
+        dist[source] = d  # Store the distances from the source
+        nexthop[source] = first  # Store the next hops from the source
+    return dist, nexthop  # Return both tables
+
+class PathTable(object):  # Define a class answering distance and next hop queries by lookup
+    def __init__(self, nodes, useCache=True):  # Initialize the tables for a node group
+        self.graph = MazeGraph(nodes)  # Export the node graph
+        digest = self.graph.digest()  # Hash the graph
+        cachedir = os.path.join(os.path.dirname(os.path.abspath(nodes.level)), CACHEDIR)  # Get the cache directory
+        distfile = os.path.join(cachedir, digest + ".dist.npy")  # Build the distance table path
+        nextfile = os.path.join(cachedir, digest + ".next.npy")  # Build the next hop table path
+        if useCache and os.path.exists(distfile) and os.path.exists(nextfile):  # If both tables are cached
+            self.dist = np.load(distfile, mmap_mode="r")  # Memory-map the distance table
+            self.nexthop = np.load(nextfile, mmap_mode="r")  # Memory-map the next hop table
+        else:  # Otherwise
+            self.dist, self.nexthop = shortestPaths(self.graph)  # Compute both tables
+            if useCache:  # If caching is enabled
+                try:  # Try to cache the tables
+                    saveCacheFile(distfile, np.save, self.dist)  # Write the distance table
+                    saveCacheFile(nextfile, np.save, self.nexthop)  # Write the next hop table
+                except OSError:  # If the directory cannot be written
+                    pass  # Keep the tables in memory only
+        self.pelletTables = {}  # Initialize the pellet attachments by pellet group
+
+    def distance(self, start, end):  # Define the method to get the path length between two nodes
+        return float(self.dist[self.graph.index[start], self.graph.index[end]])  # Look up the distance
+
+    def nextHop(self, start, end):  # Define the method to get the next node on the path between two nodes
+        hop = self.nexthop[self.graph.index[start], self.graph.index[end]]  # Look up the next hop
+        if hop == UNREACHABLE:  # If there is no path
+            return None  # Return None
+        return self.graph.nodeList[hop]  # Return the next node
+
+    def nextDirection(self, start, end):  # Define the method to get the walkable direction to leave a node toward another
+        hop = self.nextHop(start, end)  # Get the next node on the path
+        if hop is not None and hop is start.neighbors[PORTAL]:  # If the path crosses the portal, which Pacman does on arriving at the node
+            start = hop  # Leave from the portal partner instead
+            hop = self.nextHop(start, end)  # Get the next node on the path from there
+        if hop is None or hop is start:  # If already there or unreachable
+            return STOP  # Return stop
+        for direction in WALKDIRECTIONS:  # Iterate through each walkable direction, never PORTAL
+            if start.neighbors[direction] is hop:  # If the neighbor is the next hop
+                return direction  # Return the direction toward it
+        return STOP  # Return stop if no walkable edge leads on
+
+    def distanceToPacman(self, node, pacman):  # Define the method to get the path length from a node to Pacman
+        i = self.graph.index[node]  # Get the node's index
+        a = self.graph.index[pacman.node]  # Get the index of the node Pacman left
+        b = self.graph.index[pacman.target]  # Get the index of the node Pacman is heading to
+        toA = pacman.position.distanceSquared(pacman.node.position) ** 0.5  # Get Pacman's distance from the node it left
+        toB = pacman.position.distanceSquared(pacman.target.position) ** 0.5  # Get Pacman's distance to its target
+        return float(min(self.dist[i, a] + toA, self.dist[i, b] + toB))  # Return the shorter way round
+
+    def attachPellets(self, pellets):  # Define the method to place each pellet on a graph edge
+        n = len(pellets.pellets)  # Get the number of pellets
+        ends = np.zeros((n, 2), dtype=np.int32)  # Initialize the two edge endpoints of each pellet
+        offsets = np.full((n, 2), np.inf, dtype=np.float32)  # Initialize the distance from each endpoint
+        for node in self.graph.nodeList:  # Iterate through each node
+            for direction in (RIGHT, DOWN):  # Iterate through each edge once
+                neighbor = node.neighbors[direction]  # Get the neighbor in that direction
+                if neighbor is None:  # If there is no edge
+                    continue  # Skip the direction
+                length = (neighbor.position - node.position).magnitude()  # Get the edge length
+                for pellet in pellets.pelletsBetween(node.position, neighbor.position):  # Iterate through the pellets on the edge
+                    offset = (pellet.position - node.position).magnitude()  # Get the pellet's distance from the node
+                    ends[pellet.index] = self.graph.index[node], self.graph.index[neighbor]  # Record the edge endpoints
+                    offsets[pellet.index] = offset, length - offset  # Record the distance from each endpoint
+        self.pelletTables[pellets] = ends, offsets  # Store the attachments for the pellet group
+        return ends, offsets  # Return the attachments
+
+    def nearestPellet(self, node, pellets):  # Define the method to get the uneaten pellet closest to a node
+        if pellets not in self.pelletTables:  # If the pellet group has not been attached yet
+            self.attachPellets(pellets)  # Attach the pellets to graph edges
+        ends, offsets = self.pelletTables[pellets]  # Get the pellet attachments
+        row = self.dist[self.graph.index[node]]  # Get the distances from the node
+        d = np.minimum(row[ends[:, 0]] + offsets[:, 0], row[ends[:, 1]] + offsets[:, 1])  # Get the distance to each pellet
+        d[pellets.eaten] = np.inf  # Ignore eaten pellets
+        best = int(np.argmin(d)) if len(d) else -1  # Find the closest pellet
+        if best < 0 or not np.isfinite(d[best]):  # If no pellet can be reached
+            return None, float("inf")  # Return no pellet
+        return pellets.pellets[best], float(d[best])  # Return the pellet and its distance
+
+if __name__ == "__main__":  # If this module is run as the main program
+    import argparse  # Import the argparse module for the command line interface
+    from engine import GameEngine  # Import the GameEngine class from the engine module
+    parser = argparse.ArgumentParser(description="Build the path tables for a maze and check every next direction")  # Create the argument parser
+    parser.add_argument("--maze", default="maze1.txt")  # Add the maze file option
+    args = parser.parse_args()  # Parse the command line
+    engine = GameEngine(args.maze)  # Build the nodes and portals for the maze
+    table = PathTable(engine.nodes)  # Build or load the path tables
+    valid = set(WALKDIRECTIONS) | {STOP}  # Get the directions Pacman can be told to move in
+    bad = [(a.position.asTuple(), b.position.asTuple()) for a in table.graph.nodeList for b in table.graph.nodeList
+           if table.nextDirection(a, b) not in valid]  # Find every pair whose direction cannot be walked
+    print("%d nodes, %d pairs with an invalid direction" % (len(table.graph.nodeList), len(bad)))  # Print the check
+    if bad:  # If any pair failed
+        raise SystemExit("invalid directions, for example %s -> %s" % bad[0])  # Exit with an error
@@ -1,24 +1,34 @@
 import pygame  # Import the pygame module for game development
 from vector import Vector2  # Import the Vector2 class from the vector module
 from constants import *  # Import all constants from the constants module
+from mazecompiler import loadMaze  # Import the maze compiler
 import numpy as np  # Import the numpy module for numerical operations
+import bisect  # Import the bisect module for ranged lookups along edges
 
 class Pellet(object):  # Define a class for regular pellets
+    __slots__ = ("name", "position", "tile", "index", "color", "radius", "collideRadius", "points", "visible")  # Store only the pellet's fields
     def __init__(self, row, column):  # Initialize the pellet with row and column positions
         self.name = PELLET  # Set the name of the pellet type
         self.position = Vector2(column * TILEWIDTH, row * TILEHEIGHT)  # Calculate the pellet's position
+        self.tile = (column, row)  # Set the tile the pellet sits on
+        self.index = -1  # Initialize the pellet's slot in the group's eaten array
         self.color = WHITE  # Set the color of the pellet
         self.radius = int(4 * TILEWIDTH / 16)  # Set the radius of the pellet for rendering
         self.collideRadius = int(4 * TILEWIDTH / 16)  # Set the radius for collision detection
         self.points = 10  # Set the points awarded for collecting the pellet
         self.visible = True  # Set the visibility of the pellet
 
-    def render(self, screen):  # Define the method to render the pellet on the screen
+    def render(self, screen, offset=(0, 0)):  # Define the method to render the pellet on the screen shifted by a camera offset
         if self.visible:  # Only render the pellet if it is visible
-            p = self.position.asInt()  # Get the integer position of the pellet
-            pygame.draw.circle(screen, self.color, p, self.radius)  # Draw the pellet as a circle on the screen
+            x, y = self.position.asInt()  # Get the integer position of the pellet
+            pygame.draw.circle(screen, self.color, (x - offset[0], y - offset[1]), self.radius)  # Draw the pellet as a circle on the screen
+
+    def getRect(self):  # Define the method to get the screen area covered by the pellet
+        x, y = self.position.asInt()  # Get the integer position of the pellet
+        return pygame.Rect(x - self.radius, y - self.radius, self.radius * 2 + 1, self.radius * 2 + 1)  # Return the bounding rectangle
 
 class PowerPellet(Pellet):  # Define a class for power pellets, inheriting from Pellet
+    __slots__ = ("flashTime", "timer")  # Store only the extra flashing fields
     def __init__(self, row, column):  # Initialize the power pellet with row and column positions
         Pellet.__init__(self, row, column)  # Call the initializer of the parent Pellet class
         self.name = POWERPELLET  # Set the name of the pellet type to power pellet
@@ -34,35 +44,150 @@ class PowerPellet(Pellet):  # Define a class for power pellets, inheriting from
             self.timer = 0  # Reset the timer
 
 class PelletGroup(object):  # Define a class for a group of pellets
-    def __init__(self, pelletfile):  # Initialize the pellet group with a file containing pellet positions
-        self.pelletList = []  # Create an empty list to store regular pellets
+    def __init__(self, pelletfile, maze=None):  # Initialize the pellet group with a file containing pellet positions or its compiled maze
+        self.pellets = []  # Create an empty list to store every pellet by index
         self.powerpellets = []  # Create an empty list to store power pellets
-        self.createPelletList(pelletfile)  # Populate the lists by reading the pellet file
+        self.tileLUT = {}  # Initialize a lookup table from tile coordinates to pellets
+        self.createPelletList(pelletfile, maze)  # Populate the lists from the compiled pellet file
+        self.eaten = np.zeros(len(self.pellets), dtype=bool)  # Initialize the eaten state of every pellet
         self.numEaten = 0  # Initialize the count of eaten pellets
+        self.edgeLUT = {}  # Initialize the pellets on each edge sorted by distance from its start node
+
+    @property
+    def pelletList(self):  # Define the list of pellets that have not been eaten yet
+        return [pellet for pellet in self.pellets if not self.eaten[pellet.index]]  # Return the remaining pellets
 
     def update(self, dt):  # Define the method to update the pellet group
         for powerpellet in self.powerpellets:  # Iterate through all power pellets
             powerpellet.update(dt)  # Update each power pellet's state
 
-    def createPelletList(self, pelletfile):  # Define the method to create pellet lists from a file
-        data = self.readPelletfile(pelletfile)  # Read the pellet file into a data array
-        for row in range(data.shape[0]):  # Iterate through each row in the data
-            for col in range(data.shape[1]):  # Iterate through each column in the data
-                if data[row][col] in ['.', '+']:  # Check if the cell represents a regular pellet
-                    self.pelletList.append(Pellet(row, col))  # Add a regular pellet to the list
-                elif data[row][col] in ['P', 'p']:  # Check if the cell represents a power pellet
-                    pp = PowerPellet(row, col)  # Create a power pellet
-                    self.pelletList.append(pp)  # Add the power pellet to the list
-                    self.powerpellets.append(pp)  # Also add the power pellet to the power pellet list
-
-    def readPelletfile(self, textfile):  # Define the method to read the pellet file
-        return np.loadtxt(textfile, dtype='<U1')  # Load the file into a numpy array of strings
-
-    def isEmpty(self):  # Define the method to check if the pellet list is empty
-        if len(self.pelletList) == 0:  # Check if the list has no pellets
+    def createPelletList(self, pelletfile, maze=None):  # Define the method to create pellet lists from a file
+        if maze is None:  # If no compiled maze was given
+            maze = loadMaze(pelletfile)  # Get the compiled maze for the pellet file
+        for (col, row), kind in zip(maze.pelletTiles.tolist(), maze.pelletTypes.tolist()):  # Iterate through each pellet tile and type
+            if kind == PELLET:  # Check if the cell represents a regular pellet
+                self.addPellet(Pellet(row, col))  # Add a regular pellet to the group
+            else:  # Otherwise the cell represents a power pellet
+                pp = PowerPellet(row, col)  # Create a power pellet
+                self.addPellet(pp)  # Add the power pellet to the group
+                self.powerpellets.append(pp)  # Also add the power pellet to the power pellet list
+
+    def addPellet(self, pellet):  # Define the method to register a pellet in the group
+        pellet.index = len(self.pellets)  # Give the pellet the next free index
+        self.pellets.append(pellet)  # Add the pellet to the indexed list
+        self.tileLUT[pellet.tile] = pellet  # Register the pellet under its tile
+
+    def removePellet(self, pellet):  # Define the method to remove a pellet, moving the last pellet into its slot
+        last = self.pellets.pop()  # Take the last pellet off the indexed list
+        self.numEaten -= int(self.eaten[pellet.index])  # Stop counting the pellet if it was eaten
+        if last is not pellet:  # If the removed pellet was not the last one
+            self.pellets[pellet.index] = last  # Move the last pellet into the free slot
+            self.eaten[pellet.index] = self.eaten[last.index]  # Move its eaten flag too
+            last.index = pellet.index  # Give it the free index
+        self.eaten = self.eaten[:len(self.pellets)]  # Shrink the eaten flags
+        del self.tileLUT[pellet.tile]  # Forget the pellet's tile
+        if pellet.name == POWERPELLET:  # If it was a power pellet
+            self.powerpellets.remove(pellet)  # Stop flashing it
+
+    def patchTiles(self, tiles):  # Define the method to make some tiles hold a pellet of the given type, or none for 0, from (col, row, kind) triples
+        removed = []  # Create an empty list of pellets removed
+        added = []  # Create an empty list of pellets added
+        for col, row, kind in tiles:  # Iterate through each tile, removing first so the moved pellets all have eaten flags
+            pellet = self.tileLUT.get((col, row))  # Get the pellet on the tile
+            if pellet is not None and pellet.name != kind:  # If the tile has a pellet of the wrong type
+                self.removePellet(pellet)  # Remove it
+                removed.append(pellet)  # Record it
+        for col, row, kind in tiles:  # Iterate through each tile again
+            if kind == 0 or (col, row) in self.tileLUT:  # If the tile should be empty or keeps its pellet, eaten or not
+                continue  # Nothing to add
+            if kind == PELLET:  # If the tile should hold a regular pellet
+                pellet = Pellet(row, col)  # Create a regular pellet
+            else:  # Otherwise the tile should hold a power pellet
+                pellet = PowerPellet(row, col)  # Create a power pellet
+                self.powerpellets.append(pellet)  # Also add the power pellet to the power pellet list
+            self.addPellet(pellet)  # Add the pellet to the group
+            added.append(pellet)  # Record it
+        if added:  # If any pellets were added
+            self.eaten = np.concatenate([self.eaten, np.zeros(len(added), dtype=bool)])  # Give them eaten flags in one copy
+        return removed, added  # Return the pellets removed and added
+
+    def getPelletsNear(self, position):  # Define the method to get uneaten pellets around a pixel position
+        col = int(round(position.x / TILEWIDTH))  # Find the nearest tile column
+        row = int(round(position.y / TILEHEIGHT))  # Find the nearest tile row
+        found = []  # Create an empty list for the pellets found
+        for drow in (-1, 0, 1):  # Iterate through the neighboring rows first to keep row-major pellet order
+            for dcol in (-1, 0, 1):  # Iterate through the neighboring columns
+                pellet = self.tileLUT.get((col + dcol, row + drow))  # Look up the pellet on the tile
+                if pellet is not None and not self.eaten[pellet.index]:  # If there is an uneaten pellet
+                    found.append(pellet)  # Add it to the list
+        return found  # Return the pellets found in index order
+
+    def pelletsBetween(self, start, end):  # Define the method to get the pellets on the tiles along a straight line
+        col1, row1 = int(start.x) // TILEWIDTH, int(start.y) // TILEHEIGHT  # Get the tile of the start position
+        col2, row2 = int(end.x) // TILEWIDTH, int(end.y) // TILEHEIGHT  # Get the tile of the end position
+        steps = max(abs(col2 - col1), abs(row2 - row1))  # Get the number of tiles between the two positions
+        dcol = (col2 > col1) - (col2 < col1)  # Get the column step toward the end
+        drow = (row2 > row1) - (row2 < row1)  # Get the row step toward the end
+        found = []  # Create an empty list for the pellets found
+        for i in range(steps + 1):  # Iterate through each tile from start to end
+            pellet = self.tileLUT.get((col1 + dcol * i, row1 + drow * i))  # Look up the pellet on the tile
+            if pellet is not None:  # If there is a pellet on the tile
+                found.append(pellet)  # Add it to the list
+        return found  # Return the pellets ordered from start to end
+
+    def indexEdges(self, nodes):  # Define the method to sort the pellets on every edge of the node graph
+        self.edgeLUT = {}  # Forget any previous edge index
+        for node in nodes.nodesLUT.values():  # Iterate through each node
+            for direction in (UP, DOWN, LEFT, RIGHT):  # Iterate through each walkable direction
+                neighbor = node.neighbors[direction]  # Get the neighbor in that direction
+                if neighbor is not None:  # If there is an edge
+                    self.indexEdge(node, neighbor)  # Sort the pellets on it
+
+    def indexEdge(self, node, neighbor):  # Define the method to sort the pellets on one edge
+        found = self.pelletsBetween(node.position, neighbor.position)  # Get the pellets on the edge in order
+        offsets = [pellet.position.distanceSquared(node.position) ** 0.5 for pellet in found]  # Get each pellet's distance from the node
+        self.edgeLUT[(node, neighbor)] = (offsets, found)  # Store the sorted pellets for the edge
+
+    def getPelletsAlong(self, node, target, start, end, collideRadius):  # Define the method to get uneaten pellets touched by a span of an edge
+        entry = self.edgeLUT.get((node, target))  # Look up the pellets on the edge
+        if entry is None:  # If the edge has no index
+            return []  # Return no pellets
+        offsets, found = entry  # Unpack the sorted offsets and pellets
+        reach = collideRadius + int(8 * TILEWIDTH / 16)  # Get the furthest any pellet can be touched from
+        first = bisect.bisect_left(offsets, start - reach)  # Find the first pellet in reach of the span
+        last = bisect.bisect_right(offsets, end + reach)  # Find the last pellet in reach of the span
+        touched = []  # Create an empty list of pellets touched
+        while first < last:  # Iterate through the pellets in reach without building a range each call
+            pellet = found[first]  # Get the pellet
+            gap = max(start - offsets[first], offsets[first] - end, 0)  # Get the pellet's distance from the span
+            if gap <= pellet.radius + collideRadius and not self.eaten[pellet.index]:  # If the uneaten pellet touches the span
+                touched.append(pellet)  # Add it to the list
+            first += 1  # Move to the next pellet
+        return touched  # Return the pellets touched
+
+    def getState(self):  # Define the method to capture the eaten and flashing state of the pellets
+        flashing = [(pp.visible, pp.timer) for pp in self.powerpellets]  # Capture each power pellet's flashing state
+        return self.eaten.copy(), self.numEaten, flashing  # Return a copy of the state
+
+    def setState(self, state):  # Define the method to restore a captured pellet state
+        eaten, numEaten, flashing = state  # Unpack the captured state
+        self.eaten[:] = eaten  # Restore the eaten flags in place
+        self.numEaten = numEaten  # Restore the eaten count
+        for pp, (visible, timer) in zip(self.powerpellets, flashing):  # Iterate through each power pellet
+            pp.visible = visible  # Restore its visibility
+            pp.timer = timer  # Restore its flash timer
+
+    def eat(self, pellet):  # Define the method to mark a pellet as eaten
+        self.eaten[pellet.index] = True  # Set the pellet's eaten flag
+        self.numEaten += 1  # Increment the number of eaten pellets
+        return pellet.points  # Return the points awarded for the pellet
+
+    def isEmpty(self):  # Define the method to check if every pellet has been eaten
+        if self.numEaten == len(self.pellets):  # Check if the eaten count covers every pellet
             return True  # Return True if empty
         return False  # Return False otherwise
 
     def render(self, screen):  # Define the method to render all pellets on the screen
-        for pellet in self.pelletList:  # Iterate through each pellet in the list
-            pellet.render(screen)  # Render the pellet on the screen
+        for pellet in self.pellets:  # Iterate through each pellet in the group
+            if not self.eaten[pellet.index]:  # Only render pellets that have not been eaten
+                pellet.render(screen)  # Render the pellet on the screen
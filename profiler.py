@@ -0,0 +1,53 @@
+import csv  # Import the csv module for writing CSV dumps
+import json  # Import the json module for writing JSON dumps
+import time  # Import the time module for timing
+import numpy as np  # Import the numpy module for numerical operations
+
+class FrameProfiler(object):  # Define a class recording per-phase frame durations in a ring buffer
+    def __init__(self, phases, capacity=4096):  # Initialize the profiler with phase names and the number of frames to keep
+        self.phases = list(phases)  # Set the phase names in frame order
+        self.column = {phase: i for i, phase in enumerate(self.phases)}  # Map each phase to its column
+        self.samples = np.zeros((capacity, len(self.phases)), dtype=np.float64)  # Initialize the ring buffer of durations in seconds
+        self.capacity = capacity  # Set the number of frames kept
+        self.frames = 0  # Initialize the number of frames recorded
+        self.last = 0.0  # Initialize the time of the last mark
+
+    def startFrame(self):  # Define the method to begin timing a frame
+        self.samples[self.frames % self.capacity] = 0.0  # Clear the slot for this frame
+        self.last = time.perf_counter()  # Record the start time
+
+    def lap(self, phase):  # Define the method to close a phase and charge its time
+        now = time.perf_counter()  # Get the current time
+        self.samples[self.frames % self.capacity, self.column[phase]] += now - self.last  # Add the elapsed time to the phase
+        self.last = now  # Start timing the next phase
+
+    def endFrame(self):  # Define the method to finish timing a frame
+        self.frames += 1  # Count the frame
+
+    def getSamples(self):  # Define the method to get the recorded frames in order
+        if self.frames <= self.capacity:  # If the buffer has not wrapped yet
+            return self.samples[:self.frames]  # Return the filled part
+        start = self.frames % self.capacity  # Find the oldest frame
+        return np.concatenate([self.samples[start:], self.samples[:start]])  # Return the frames oldest first
+
+    def percentiles(self, q=(50, 95, 99)):  # Define the method to get frame time percentiles in milliseconds
+        samples = self.getSamples() * 1000.0  # Get the recorded frames in milliseconds
+        result = {}  # Create an empty table of results
+        if len(samples) == 0:  # If nothing has been recorded
+            return result  # Return the empty table
+        columns = [("frame", samples.sum(axis=1))] + [(phase, samples[:, i]) for i, phase in enumerate(self.phases)]  # Pair each name with its durations
+        for name, values in columns:  # Iterate through the whole frame and each phase
+            result[name] = {"p%d" % p: float(v) for p, v in zip(q, np.percentile(values, q))}  # Store the percentiles
+        return result  # Return the table of percentiles
+
+    def dumpCSV(self, path):  # Define the method to write every recorded frame to a CSV file
+        with open(path, "w", newline="") as f:  # Open the output file
+            writer = csv.writer(f)  # Create the CSV writer
+            writer.writerow(["frame"] + [phase + "_ms" for phase in self.phases])  # Write the header
+            first = max(0, self.frames - self.capacity)  # Get the number of the oldest frame kept
+            for i, row in enumerate(self.getSamples() * 1000.0):  # Iterate through each frame
+                writer.writerow([first + i] + ["%.4f" % v for v in row])  # Write the frame's durations
+
+    def dumpJSON(self, path):  # Define the method to write the percentiles to a JSON file
+        with open(path, "w") as f:  # Open the output file
+            json.dump({"frames": self.frames, "percentiles": self.percentiles()}, f, indent=2)  # Write the summary
@@ -0,0 +1,92 @@
+import pygame  # Import the pygame module for game development
+import numpy as np  # Import the numpy module for numerical operations
+from constants import *  # Import all constants from the constants module
+from camera import ChunkIndex, Viewport  # Import the chunk index and viewport from the camera module
+
+class MazeRenderer(object):  # Define a class that draws the game using a cached maze layer and dirty rectangles
+    def __init__(self, screen, background, nodes, pellets):  # Initialize the renderer with the screen and the game objects
+        self.screen = screen  # Set the display surface
+        self.nodes = nodes  # Set the node group
+        self.pellets = pellets  # Set the pellet group
+        self.background = background  # Set the background surface
+        self.bake()  # Bake the maze and pellets and push the whole screen on the first frame
+
+    def bake(self):  # Define the method to draw the maze graph onto the maze layer
+        self.mazeLayer = self.background.copy()  # Copy the background for the maze layer
+        self.nodes.render(self.mazeLayer)  # Bake the maze graph onto the maze layer
+        self.reset()  # Bake the pellets and push the whole screen on the first frame
+
+    def applyPatch(self, patch):  # Define the method to show a hot-reloaded maze edit
+        self.bake()  # Re-bake the layers, which costs no more than one screen since the whole maze fits on it
+
+    def reset(self):  # Define the method to rebuild the pellet layer, for example after seeking back in a replay
+        self.staticLayer = self.mazeLayer.copy()  # Copy the maze layer for the pellet layer
+        for pellet in self.pellets.pellets:  # Iterate through each pellet
+            if pellet.name == PELLET and not self.pellets.eaten[pellet.index]:  # Only bake uneaten regular pellets
+                pellet.render(self.staticLayer)  # Bake the pellet onto the static layer
+        self.erased = self.pellets.eaten.copy()  # Remember which pellets are already off the static layer
+        self.spriteRects = []  # Initialize the areas covered by sprites last frame
+        self.fullUpdate = True  # Push the whole screen on the first frame
+
+    def erasePellets(self, rects):  # Define the method to remove newly eaten pellets from the static layer
+        newly = np.flatnonzero(self.pellets.eaten & ~self.erased)  # Find pellets eaten since the last frame
+        for index in newly:  # Iterate through each newly eaten pellet
+            rect = self.pellets.pellets[index].getRect()  # Get the area covered by the pellet
+            self.staticLayer.blit(self.mazeLayer, rect, rect)  # Restore the maze underneath the pellet
+            self.screen.blit(self.staticLayer, rect, rect)  # Copy the restored area to the screen
+            rects.append(rect)  # Mark the area as changed
+        self.erased[newly] = True  # Record the pellets as erased
+
+    def render(self, pacman, alpha=1.0):  # Define the method to draw one frame a fraction alpha of the way through the current step
+        pacman.interpolate(alpha)  # Place Pacman between simulation steps
+        rects = []  # Create an empty list of changed areas
+        if self.fullUpdate:  # If the whole screen must be drawn
+            self.screen.blit(self.staticLayer, (0, 0))  # Draw the static layer on the screen
+        self.erasePellets(rects)  # Remove newly eaten pellets
+        for rect in self.spriteRects:  # Iterate through last frame's sprite areas
+            self.screen.blit(self.staticLayer, rect, rect)  # Restore the static layer underneath
+            rects.append(rect)  # Mark the area as changed
+        self.spriteRects = []  # Reset the sprite areas
+        for powerpellet in self.pellets.powerpellets:  # Iterate through all power pellets
+            if not self.pellets.eaten[powerpellet.index]:  # Only draw power pellets that have not been eaten
+                rect = powerpellet.getRect()  # Get the area covered by the power pellet
+                self.screen.blit(self.staticLayer, rect, rect)  # Clear the area before drawing
+                powerpellet.render(self.screen)  # Draw the power pellet if it is visible
+                self.spriteRects.append(rect)  # Mark the area as covered by a sprite
+        pacman.render(self.screen)  # Draw Pacman on the screen
+        self.spriteRects.append(pacman.getRect())  # Mark Pacman's area as covered by a sprite
+        rects.extend(self.spriteRects)  # Add the new sprite areas to the changed areas
+        if self.fullUpdate:  # If the whole screen was drawn
+            pygame.display.update()  # Push the whole screen
+            self.fullUpdate = False  # Only push changed areas from now on
+        else:  # Otherwise
+            pygame.display.update(rects)  # Push only the changed areas
+        return rects  # Return the changed areas
+
+class ViewportRenderer(object):  # Define a class that draws only the part of a large maze inside a scrolling viewport
+    def __init__(self, screen, background, nodes, pellets):  # Initialize the renderer with the screen and the game objects
+        self.screen = screen  # Set the display surface
+        self.background = background  # Set the background surface
+        self.pellets = pellets  # Set the pellet group
+        self.index = ChunkIndex(nodes, pellets)  # Bucket the maze contents by chunk
+        rows, cols = nodes.maze.grid.shape  # Get the maze size in tiles
+        width, height = screen.get_size()  # Get the screen size in pixels
+        self.viewport = Viewport(width, height, cols * TILEWIDTH, rows * TILEHEIGHT)  # Create the viewport onto the maze
+
+    def applyPatch(self, patch):  # Define the method to show a hot-reloaded maze edit
+        self.index.applyPatch(patch)  # Rebucket only what changed, since every frame is drawn from the index
+
+    def render(self, pacman, alpha=1.0):  # Define the method to draw one frame a fraction alpha of the way through the current step
+        pacman.interpolate(alpha)  # Place Pacman between simulation steps
+        self.viewport.follow(pacman.renderPosition)  # Keep Pacman in view
+        offset = self.viewport.getOffset()  # Get the shift from maze to screen pixels
+        chunks = self.index.chunksIn(offset[0], offset[1], self.viewport.width, self.viewport.height)  # Find the visible chunks
+        self.screen.blit(self.background, (0, 0))  # Draw the background on the screen
+        for start, end in self.index.visibleEdges(chunks):  # Iterate through each visible edge
+            start.renderEdge(self.screen, end, offset)  # Draw the edge
+        for node in self.index.visibleNodes(chunks):  # Iterate through each visible node
+            node.renderNode(self.screen, offset)  # Draw the node
+        for pellet in self.index.visiblePellets(chunks):  # Iterate through each visible pellet
+            pellet.render(self.screen, offset)  # Draw the pellet
+        pacman.render(self.screen, offset)  # Draw Pacman on the screen
+        pygame.display.update()  # Push the whole screen since scrolling moves everything
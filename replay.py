@@ -0,0 +1,107 @@
+import argparse  # Import the argparse module for the command line interface
+import bisect  # Import the bisect module for finding snapshots
+import struct  # Import the struct module for the binary log header
+import time  # Import the time module for measuring replay speed
+import numpy as np  # Import the numpy module for numerical operations
+from constants import *  # Import all constants from the constants module
+from engine import GameEngine  # Import the GameEngine class from the engine module
+
+MAGIC = b"PMRL"  # Define the bytes that start every input log
+VERSION = 1  # Define the input log format version
+HEADER = struct.Struct("<4sBdII")  # Define the header layout: magic, version, timestep, level name length, run count
+RUN = np.dtype([("direction", "<i1"), ("ticks", "<u4")])  # Define the layout of one run of repeated directions
+
+class InputRecorder(object):  # Define an input provider that records another provider's directions
+    def __init__(self, inputProvider):  # Initialize the recorder around the provider being recorded
+        self.inputProvider = inputProvider  # Set the provider being recorded
+        self.runs = []  # Initialize the recorded [direction, ticks] runs
+
+    def getDirection(self, pacman):  # Define the method to get and record the direction for this tick
+        direction = self.inputProvider.getDirection(pacman)  # Ask the recorded provider for a direction
+        if self.runs and self.runs[-1][0] == direction:  # If the direction continues the last run
+            self.runs[-1][1] += 1  # Extend the run
+        else:  # Otherwise
+            self.runs.append([direction, 1])  # Start a new run
+        return direction  # Return the direction
+
+    def save(self, path, level, dt):  # Define the method to write the recorded log
+        runs = np.array([tuple(run) for run in self.runs], dtype=RUN)  # Pack the runs into a compact array
+        name = level.encode("utf-8")  # Encode the level name
+        with open(path, "wb") as f:  # Open the output file
+            f.write(HEADER.pack(MAGIC, VERSION, dt, len(name), len(runs)))  # Write the header
+            f.write(name)  # Write the level name
+            f.write(runs.tobytes())  # Write the runs
+
+def loadLog(path):  # Define the function to read an input log
+    with open(path, "rb") as f:  # Open the log file
+        data = f.read()  # Read the whole log
+    magic, version, dt, namelength, count = HEADER.unpack_from(data)  # Read the header
+    if magic != MAGIC or version != VERSION:  # If the file is not a log this code can read
+        raise ValueError("%s is not a version %d input log" % (path, VERSION))  # Refuse the file
+    start = HEADER.size + namelength  # Find the start of the runs
+    level = data[HEADER.size:start].decode("utf-8")  # Read the level name
+    runs = np.frombuffer(data, dtype=RUN, count=count, offset=start)  # Read the runs
+    return level, dt, runs  # Return the level, timestep and runs
+
+class ReplayInput(object):  # Define an input provider that plays back recorded runs
+    def __init__(self, runs):  # Initialize with the recorded runs
+        self.directions = runs["direction"].tolist()  # Get the direction of each run
+        self.ends = np.cumsum(runs["ticks"]).tolist()  # Get the tick each run ends on
+        self.seek(0)  # Start at the first tick
+
+    def seek(self, tick):  # Define the method to move playback to a tick
+        self.tick = tick  # Set the next tick to play
+        self.run = bisect.bisect_right(self.ends, tick)  # Find the run containing the tick
+
+    def getDirection(self, pacman):  # Define the method to get the recorded direction for this tick
+        if self.run >= len(self.ends):  # If the log has run out
+            return STOP  # Return stop after the end of the log
+        direction = self.directions[self.run]  # Get the direction of the current run
+        self.tick += 1  # Move on to the next tick
+        if self.tick >= self.ends[self.run]:  # If the run is finished
+            self.run += 1  # Move on to the next run
+        return direction  # Return the direction
+
+    def length(self):  # Define the method to get the number of recorded ticks
+        return self.ends[-1] if self.ends else 0  # Return the tick the last run ends on
+
+class Replayer(object):  # Define a class that re-runs a log deterministically and seeks with snapshots
+    def __init__(self, path, snapshotInterval=600):  # Initialize the replayer with a log file and snapshot spacing in ticks
+        level, dt, runs = loadLog(path)  # Read the log
+        self.input = ReplayInput(runs)  # Create the playback input
+        self.engine = GameEngine(level, self.input, dt)  # Create the engine with the recorded timestep
+        self.snapshotInterval = snapshotInterval  # Set the ticks between snapshots
+        self.snapshotTicks = [0]  # Initialize the ticks that have snapshots
+        self.snapshots = [self.engine.snapshot()]  # Take the snapshot of the starting state
+
+    def step(self):  # Define the method to advance one tick and take snapshots on schedule
+        self.engine.step()  # Advance the simulation
+        ticks = self.engine.ticks  # Get the current tick
+        if ticks % self.snapshotInterval == 0 and ticks > self.snapshotTicks[-1]:  # If a new snapshot is due
+            self.snapshotTicks.append(ticks)  # Record the snapshot's tick
+            self.snapshots.append(self.engine.snapshot())  # Take the snapshot
+
+    def runToEnd(self):  # Define the method to replay the whole log as fast as possible
+        self.seek(self.snapshotTicks[-1])  # Continue from the latest snapshot
+        for i in range(self.input.length() - self.engine.ticks):  # Iterate through each remaining tick
+            self.step()  # Advance the replay
+        return self.engine  # Return the engine in its final state
+
+    def seek(self, tick):  # Define the method to put the simulation in its state at a tick
+        i = bisect.bisect_right(self.snapshotTicks, tick) - 1  # Find the latest snapshot at or before the tick
+        self.engine.restore(self.snapshots[i])  # Restore the snapshot
+        self.input.seek(self.engine.ticks)  # Move the input to the same tick
+        while self.engine.ticks < tick:  # Run until the tick is reached
+            self.step()  # Advance the replay
+        return self.engine  # Return the engine at the tick
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Replay a recorded Pacman input log")  # Create the argument parser
+    parser.add_argument("log")  # Add the log file argument
+    parser.add_argument("--tick", type=int, help="print the state at this tick instead of the end")  # Add the seek option
+    args = parser.parse_args()  # Parse the command line
+    replayer = Replayer(args.log)  # Create the replayer
+    start = time.perf_counter()  # Record the start time
+    engine = replayer.runToEnd() if args.tick is None else replayer.seek(args.tick)  # Replay to the end or to the tick
+    elapsed = time.perf_counter() - start  # Calculate the elapsed time
+    print("tick=%d score=%d eaten=%d pacman=%s (%.3fs)" % (engine.ticks, engine.score, engine.pellets.numEaten, engine.pacman.position, elapsed))  # Print the state
@@ -1,16 +1,31 @@
+import argparse  # Import the argparse module for the command line interface
 import pygame  # Import the pygame module for game development
 from pygame.locals import *  # Import all constants from pygame.locals
 from constants import *  # Import all constants from the constants module
-from pacman import Pacman  # Import the Pacman class from the pacman module
-from nodes import NodeGroup  # Import the NodeGroup class from the nodes module
-from pellets import PelletGroup  # Import the PelletGroup class from the pellets module
+from engine import GameEngine, PHASES, SIMRATE  # Import the GameEngine class, profiled phases and simulation rate from the engine module
+from inputs import BufferedKeyboardInput  # Import the buffered keyboard input provider from the inputs module
+from renderer import MazeRenderer, ViewportRenderer  # Import the renderers from the renderer module
+from profiler import FrameProfiler  # Import the FrameProfiler class from the profiler module
+from replay import InputRecorder  # Import the InputRecorder class from the replay module
+from stream import StreamServer  # Import the StreamServer class from the stream module
+from hotreload import MazeReloader  # Import the MazeReloader class from the hotreload module
+
+MAXFRAMETIME = 0.25  # Define the longest frame the simulation catches up on, in seconds
 
 class GameController(object):  # Define a class for game control
-    def __init__(self):  # Initialize the game controller
+    def __init__(self, level="maze1.txt", profilePath=None, recordPath=None, fps=0, streamPort=None, watch=False):  # Initialize the game controller with a maze file, optional output files, a frame rate cap, an optional spectator port and maze watching
         pygame.init()  # Initialize all imported pygame modules
         self.screen = pygame.display.set_mode(SCREENSIZE, 0, 32)  # Set up the display mode with screen size
         self.background = None  # Initialize the background to None
         self.clock = pygame.time.Clock()  # Create a clock object to manage time
+        self.profiler = FrameProfiler(PHASES)  # Create the frame profiler
+        self.profilePath = profilePath  # Set the file the profile is written to on exit
+        self.level = level  # Set the maze file
+        self.recordPath = recordPath  # Set the file the input log is written to on exit
+        self.fps = fps  # Set the frame rate cap, or 0 for uncapped
+        self.accumulator = 0.0  # Initialize the time not yet simulated
+        self.server = StreamServer(port=streamPort) if streamPort is not None else None  # Start the spectator server if requested
+        self.watch = watch  # Set whether the maze file is reloaded when it changes
 
     def setBackground(self):  # Define method to set the background
         self.background = pygame.surface.Surface(SCREENSIZE).convert()  # Create a surface for the background
@@ -18,39 +33,83 @@ class GameController(object):  # Define a class for game control
 
     def startGame(self):  # Define method to start the game
         self.setBackground()  # Set the background for the game
-        self.nodes = NodeGroup("maze1.txt")  # Initialize the node group with a maze file
-        self.nodes.setPortalPair((0, 17), (27, 17))  # Set portal pairs in the maze
-        self.pacman = Pacman(self.nodes.getStartTempNode())  # Initialize Pacman with the starting node
-        self.pellets = PelletGroup("maze1.txt")  # Initialize the pellet group with the maze file
+        self.keyboard = BufferedKeyboardInput()  # Read directions from the keyboard, buffering taps
+        self.input = self.keyboard  # Feed the keyboard to Pacman
+        if self.recordPath is not None:  # If the session is being recorded
+            self.input = InputRecorder(self.input)  # Record every direction read
+        self.engine = GameEngine(self.level, self.input, 1.0 / SIMRATE)  # Initialize the simulation with the maze file, the input and a fixed tick
+        self.nodes = self.engine.nodes  # Keep a reference to the node group
+        self.pacman = self.engine.pacman  # Keep a reference to Pacman
+        self.pellets = self.engine.pellets  # Keep a reference to the pellet group
+        self.engine.profiler = self.profiler  # Let the engine time its phases
+        self.reloader = MazeReloader(self.engine) if self.watch else None  # Watch the maze file if requested
+        self.createRenderer()  # Create the renderer for the maze
+
+    def createRenderer(self):  # Define method to pick and build the renderer for the maze
+        rows, cols = self.reloader.grid.shape if self.reloader is not None else self.nodes.maze.grid.shape  # Get the maze size in tiles
+        if cols <= NCOLS and rows <= NROWS:  # If the whole maze fits on the screen
+            self.renderer = MazeRenderer(self.screen, self.background, self.nodes, self.pellets)  # Bake the maze into the renderer
+        else:  # Otherwise the maze must scroll
+            self.renderer = ViewportRenderer(self.screen, self.background, self.nodes, self.pellets)  # Draw only what the viewport sees
 
     def update(self):  # Define method to update the game state
-        dt = self.clock.tick(30) / 1000.0  # Calculate the delta time since the last frame
-        self.pacman.update(dt)  # Update Pacman's state
-        self.pellets.update(dt)  # Update the pellet group's state
-        self.checkPelletEvents()  # Check for pellet events
-        self.checkEvents()  # Check for other events
+        frameTime = min(self.clock.tick(self.fps) / 1000.0, MAXFRAMETIME)  # Calculate the time since the last frame
+        self.profiler.startFrame()  # Start timing the frame after the clock wait
+        self.checkEvents()  # Check for events before simulating so taps are seen this frame
+        self.profiler.lap("events")  # Charge the time to event handling
+        report = self.reloader.poll() if self.reloader is not None else None  # Reload the maze if its file changed
+        if report is not None:  # If the maze was reloaded
+            if "patch" in report:  # If the maze was patched in place
+                self.renderer.applyPatch(report["patch"])  # Show only what changed
+            else:  # Otherwise the maze changed size and was rebuilt
+                self.nodes = self.engine.nodes  # Refresh the node group
+                self.pellets = self.engine.pellets  # Refresh the pellet group
+                self.createRenderer()  # Rebuild the renderer
+            if self.server is not None:  # If spectators may be watching
+                self.server.resync()  # Send them the patched pellets
+        self.profiler.lap("reload")  # Charge the time to watching the maze file
+        self.accumulator += frameTime  # Add the frame's time to the time not yet simulated
+        while self.accumulator >= self.engine.dt:  # Run as many fixed ticks as the time covers
+            eaten = self.engine.step()  # Advance the simulation by one fixed tick
+            if self.server is not None:  # If spectators may be watching
+                self.server.publish(self.engine, eaten)  # Send them the tick
+                self.profiler.lap("stream")  # Charge the time to streaming
+            self.accumulator -= self.engine.dt  # Use up the tick's time
         self.render()  # Render the game screen
+        self.profiler.lap("render")  # Charge the time to rendering
+        self.profiler.endFrame()  # Finish timing the frame
 
     def checkEvents(self):  # Define method to check for events
         for event in pygame.event.get():  # Iterate through all events
+            self.keyboard.handleEvent(event)  # Let the keyboard buffer arrow key presses
             if event.type == QUIT:  # If the event is quitting the game
+                if self.profilePath is not None:  # If a profile was requested
+                    self.saveProfile(self.profilePath)  # Write the profile
+                if self.recordPath is not None:  # If the session was recorded
+                    self.input.save(self.recordPath, self.level, self.engine.dt)  # Write the input log
+                if self.server is not None:  # If the spectator server is running
+                    self.server.close()  # Disconnect the spectators
                 exit()  # Exit the game
 
-    def checkPelletEvents(self):  # Define method to check for pellet events
-        pellet = self.pacman.eatPellets(self.pellets.pelletList)  # Check if Pacman eats a pellet
-        if pellet:  # If a pellet is eaten
-            self.pellets.numEaten += 1  # Increment the number of eaten pellets
-            self.pellets.pelletList.remove(pellet)  # Remove the eaten pellet from the list
+    def saveProfile(self, path):  # Define method to write the frame profile
+        if path.endswith(".csv"):  # If a CSV file was requested
+            self.profiler.dumpCSV(path)  # Write every recorded frame
+        else:  # Otherwise
+            self.profiler.dumpJSON(path)  # Write the percentiles as JSON
 
     def render(self):  # Define method to render the game screen
-        self.screen.blit(self.background, (0, 0))  # Draw the background on the screen
-        self.nodes.render(self.screen)  # Render the nodes on the screen
-        self.pellets.render(self.screen)  # Render the pellets on the screen
-        self.pacman.render(self.screen)  # Render Pacman on the screen
-        pygame.display.update()  # Update the display with changes
+        self.renderer.render(self.pacman, self.accumulator / self.engine.dt)  # Draw the frame between the last two ticks
 
 if __name__ == "__main__":  # If this module is run as the main program
-    game = GameController()  # Create a game controller object
+    parser = argparse.ArgumentParser(description="Play Pacman")  # Create the argument parser
+    parser.add_argument("--maze", default="maze1.txt", help="maze file to play")  # Add the maze file option
+    parser.add_argument("--profile", help="write frame timings to this .json or .csv file on exit")  # Add the profile output option
+    parser.add_argument("--record", help="write the input log to this file on exit")  # Add the input log option
+    parser.add_argument("--fps", type=int, default=0, help="cap the frame rate; 0 renders as fast as possible")  # Add the frame rate cap option
+    parser.add_argument("--stream", type=int, metavar="PORT", help="publish every tick to spectators on this local port")  # Add the spectator server option
+    parser.add_argument("--watch", action="store_true", help="reload the maze whenever its file changes")  # Add the maze watching option
+    args = parser.parse_args()  # Parse the command line
+    game = GameController(args.maze, args.profile, args.record, args.fps, args.stream, args.watch)  # Create a game controller object
     game.startGame()  # Start the game
     while True:  # Run the game loop indefinitely
         game.update()  # Update the game state in each loop iteration
@@ -0,0 +1,122 @@
+import argparse  # Import the argparse module for the command line interface
+import multiprocessing  # Import the multiprocessing module for the process pool
+import time  # Import the time module for timing episodes
+from multiprocessing import shared_memory  # Import shared memory blocks for the compiled mazes
+import numpy as np  # Import the numpy module for numerical operations
+from constants import *  # Import all constants from the constants module
+from engine import GameEngine  # Import the GameEngine class from the engine module
+from inputs import RandomInput, ScriptedInput  # Import the input providers used by episode policies
+from mazecompiler import CompiledMaze, loadMaze  # Import the maze compiler
+
+ARRAYS = ["grid", "nodeTiles", "neighbors", "pelletTiles", "pelletTypes"]  # Define the compiled maze arrays placed in shared memory
+POLICIES = {  # Define the named policies an episode can use, each building an input provider from a seed and arguments
+    "random": lambda seed, args: RandomInput(seed, *args),  # Seeded random directions
+    "script": lambda seed, args: ScriptedInput.fromRuns(args),  # Fixed (direction, ticks) runs
+}
+
+class SharedMaze(object):  # Define a class placing a compiled maze in one shared memory block
+    def __init__(self, level):  # Initialize by compiling the level and copying its arrays into shared memory
+        maze = loadMaze(level)  # Get the compiled maze
+        self.layout = []  # Initialize the (name, dtype, shape, offset) of each array
+        offset = 0  # Initialize the offset of the next array
+        for name in ARRAYS:  # Iterate through each array
+            array = getattr(maze, name)  # Get the array
+            self.layout.append((name, array.dtype.str, array.shape, offset))  # Record where it goes
+            offset += (array.nbytes + 7) // 8 * 8  # Move past it, keeping the next array aligned
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))  # Create the shared block
+        for name, dtype, shape, start in self.layout:  # Iterate through each array
+            view = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=start)  # View the array's place in the block
+            view[...] = getattr(maze, name)  # Copy the array in
+        self.handle = (level, self.shm.name, self.layout, maze.digest)  # Build the picklable handle workers attach with
+
+    def close(self):  # Define the method to release the shared block
+        self.shm.close()  # Detach from the block
+        self.shm.unlink()  # Free the block
+
+def attachMaze(handle):  # Define the function to view a shared compiled maze without copying it
+    level, name, layout, digest = handle  # Unpack the handle
+    shm = shared_memory.SharedMemory(name=name)  # Attach to the shared block
+    arrays = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start) for key, dtype, shape, start in layout}  # View each array in place
+    maze = CompiledMaze(arrays["grid"], arrays["nodeTiles"], arrays["neighbors"],
+                        arrays["pelletTiles"], arrays["pelletTypes"], digest)  # Build the compiled maze on the views
+    return shm, maze  # Return the block, which must stay open, and the maze
+
+class EpisodeSpec(object):  # Define a class describing one independent game
+    def __init__(self, level="maze1.txt", startTile=None, policy="random", seed=0, ticks=10000, policyArgs=()):  # Initialize the episode description
+        self.level = level  # Set the maze file
+        self.startTile = startTile  # Set the (col, row) of the start node, or None for the default
+        self.policy = policy  # Set the policy name
+        self.seed = seed  # Set the random seed
+        self.ticks = ticks  # Set the maximum number of ticks
+        self.policyArgs = policyArgs  # Set any extra policy arguments
+
+_workerMazes = {}  # Initialize each worker's attached mazes by level
+_workerEngines = {}  # Initialize each worker's reusable engines by level
+
+def initWorker(handles):  # Define the function run once in each worker process
+    for handle in handles:  # Iterate through each shared maze
+        _workerMazes[handle[0]] = attachMaze(handle)  # Attach to it
+
+def runEpisode(job):  # Define the function running one episode inside a worker
+    number, spec = job  # Unpack the episode number and description
+    start = time.perf_counter()  # Record the start time
+    engine = _workerEngines.get(spec.level)  # Get the worker's engine for the maze
+    if engine is None:  # If the worker has not built it yet
+        engine = GameEngine(spec.level, maze=_workerMazes[spec.level][1])  # Build it once from the shared maze
+        _workerEngines[spec.level] = engine  # Keep it for later episodes
+    startNode = None  # Initialize the start node as the default
+    if spec.startTile is not None:  # If a start tile was given
+        startNode = engine.nodes.getNodeFromTiles(*spec.startTile)  # Find the start node
+        if startNode is None:  # If no node sits on the tile
+            raise ValueError("no node on start tile %r in %s" % (spec.startTile, spec.level))  # Refuse to run a different episode
+    engine.reset(POLICIES[spec.policy](spec.seed, spec.policyArgs), startNode)  # Start a fresh game
+    ticks = engine.run(spec.ticks)  # Play the game
+    return {"episode": number, "level": spec.level, "seed": spec.seed, "score": engine.score,
+            "numEaten": engine.pellets.numEaten, "ticks": ticks, "seconds": time.perf_counter() - start}  # Return the result
+
+class EpisodeRunner(object):  # Define a class spreading episodes across a process pool
+    def __init__(self, levels, processes=None):  # Initialize the runner with the mazes episodes may use
+        self.mazes = [SharedMaze(level) for level in levels]  # Place each maze in shared memory once
+        self.levels = set(levels)  # Remember which mazes the workers have
+        handles = [maze.handle for maze in self.mazes]  # Get the handles for the workers
+        self.pool = multiprocessing.Pool(processes, initializer=initWorker, initargs=(handles,))  # Start the workers
+
+    def run(self, specs, chunksize=1):  # Define the method to run episodes and yield results as they finish
+        specs = list(specs)  # Get every episode so they can be checked before any is started
+        for spec in specs:  # Iterate through each episode
+            if spec.level not in self.levels:  # If its maze was not shared with the workers
+                raise ValueError("episode level %s was not passed to EpisodeRunner" % spec.level)  # Refuse it
+        for result in self.pool.imap_unordered(runEpisode, enumerate(specs), chunksize):  # Iterate through results in finishing order
+            yield result  # Stream the result back
+
+    def close(self, terminate=False):  # Define the method to stop the workers, optionally without finishing queued episodes, and free shared memory
+        if terminate:  # If the queued episodes are no longer wanted
+            self.pool.terminate()  # Stop the workers at once
+        else:  # Otherwise
+            self.pool.close()  # Stop accepting episodes
+        self.pool.join()  # Wait for the workers to exit
+        for maze in self.mazes:  # Iterate through each shared maze
+            maze.close()  # Free it
+
+    def __enter__(self):  # Define entering a with block
+        return self  # Return the runner
+
+    def __exit__(self, *exc):  # Define leaving a with block
+        self.close(terminate=exc[0] is not None)  # Stop the workers, abandoning queued episodes on an error, and free shared memory
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Run many headless Pacman games across processes")  # Create the argument parser
+    parser.add_argument("--maze", default="maze1.txt")  # Add the maze file option
+    parser.add_argument("--episodes", type=int, default=64)  # Add the number of episodes option
+    parser.add_argument("--ticks", type=int, default=10000)  # Add the maximum ticks per episode option
+    parser.add_argument("--processes", type=int, default=None)  # Add the number of worker processes option
+    args = parser.parse_args()  # Parse the command line
+    specs = [EpisodeSpec(args.maze, seed=seed, ticks=args.ticks) for seed in range(args.episodes)]  # Describe one random episode per seed
+    start = time.perf_counter()  # Record the start time
+    total = 0  # Initialize the total ticks simulated
+    with EpisodeRunner([args.maze], args.processes) as runner:  # Start the runner
+        for result in runner.run(specs):  # Iterate through results as they finish
+            total += result["ticks"]  # Add the episode's ticks
+            print("episode %(episode)d seed %(seed)d: score %(score)d, eaten %(numEaten)d, %(ticks)d ticks, %(seconds).2fs" % result)  # Print the result
+    elapsed = time.perf_counter() - start  # Calculate the elapsed time
+    print("%d episodes, %.0f steps/sec" % (len(specs), total / elapsed))  # Print the throughput
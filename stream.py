@@ -0,0 +1,240 @@
+import argparse  # Import the argparse module for the command line interface
+import selectors  # Import the selectors module for polling sockets without blocking
+import socket  # Import the socket module for the spectator connections
+import struct  # Import the struct module for the binary messages
+import time  # Import the time module for the client's status line
+from collections import deque  # Import deque for each client's queue of outgoing messages
+import numpy as np  # Import the numpy module for packing the pellet bitmap
+from constants import *  # Import all constants from the constants module
+
+PORT = 7777  # Define the default spectator port
+KEYFRAME = 1  # Define the message type carrying the full game state
+DELTA = 2  # Define the message type carrying one tick's changes
+MESSAGE = struct.Struct("<BI")  # Define the message header layout: type, payload length
+KEYFRAMEHEADER = struct.Struct("<IIffbIH")  # Define the keyframe layout: tick, score, x, y, direction, pellet count, level name length
+DELTAHEADER = struct.Struct("<IIffbH")  # Define the delta layout: tick, score, x, y, direction, number of pellets eaten
+MAXQUEUED = 64 * 1024  # Define the bytes of deltas a client may fall behind its last keyframe before they are dropped
+SENDBUFFER = 16 * 1024  # Define the kernel send buffer per client, kept small so a slow client shows up in its queue
+
+def encodeKeyframe(engine):  # Define the function to pack the full game state
+    pacman = engine.pacman  # Get Pacman
+    name = engine.level.encode("utf-8")  # Encode the level name
+    bits = np.packbits(engine.pellets.eaten, bitorder="little").tobytes()  # Pack the eaten flags eight to a byte
+    payload = KEYFRAMEHEADER.pack(engine.ticks, engine.score, pacman.position.x, pacman.position.y, pacman.direction,
+                                  len(engine.pellets.pellets), len(name)) + name + bits  # Pack the state
+    return MESSAGE.pack(KEYFRAME, len(payload)) + payload  # Return the framed message
+
+def encodeDelta(engine, eaten):  # Define the function to pack one tick's changes
+    pacman = engine.pacman  # Get Pacman
+    indices = np.array([pellet.index for pellet in eaten], dtype="<u4").tobytes()  # Pack the indices of the pellets eaten
+    payload = DELTAHEADER.pack(engine.ticks, engine.score, pacman.position.x, pacman.position.y, pacman.direction, len(eaten)) + indices  # Pack the changes
+    return MESSAGE.pack(DELTA, len(payload)) + payload  # Return the framed message
+
+class Spectator(object):  # Define a class holding one connected client and the messages it has not received
+    def __init__(self, sock):  # Initialize with the client's socket
+        self.sock = sock  # Set the socket
+        self.queue = deque()  # Initialize the messages waiting to be sent
+        self.offset = 0  # Initialize the bytes of the first message already sent
+        self.queued = 0  # Initialize the bytes waiting to be sent
+        self.needKeyframe = True  # Start the client with the full state
+        self.dropped = 0  # Initialize the number of times the client fell too far behind
+        self.limit = MAXQUEUED  # Initialize the bytes the client may fall behind
+
+    def push(self, message):  # Define the method to queue a delta, dropping the backlog if the client is too slow
+        if self.queued + len(message) > self.limit:  # If the client has fallen too far behind
+            self.dropBacklog()  # Drop what it has not received
+            self.needKeyframe = True  # Resync the client with the full state
+            self.dropped += 1  # Count the drop
+            return  # Skip the message
+        self.queue.append(message)  # Queue the message
+        self.queued += len(message)  # Count its bytes
+
+    def pushKeyframe(self, message):  # Define the method to queue a keyframe, which replaces anything not yet sent
+        self.dropBacklog()  # Drop the deltas the keyframe makes stale
+        self.queue.append(message)  # Queue the keyframe whatever its size
+        self.queued += len(message)  # Count its bytes
+        self.limit = len(message) + MAXQUEUED  # Let deltas queue behind the keyframe, however large it is
+        self.needKeyframe = False  # Mark the client as synced
+
+    def dropBacklog(self):  # Define the method to drop every queued message except one that is partly sent
+        head = self.queue.popleft() if self.offset > 0 else None  # Keep the message that is partly sent so the stream stays whole
+        self.queue.clear()  # Drop the rest of the backlog
+        self.queued = 0  # Reset the queued bytes
+        if head is not None:  # If a message was partly sent
+            self.queue.append(head)  # Put it back
+            self.queued = len(head) - self.offset  # Count what is left of it
+
+    def flush(self):  # Define the method to send as much as the socket takes without blocking
+        while self.queue:  # While messages are waiting
+            head = self.queue[0]  # Get the first message
+            sent = self.sock.send(memoryview(head)[self.offset:])  # Send what is left of it
+            self.queued -= sent  # Count the bytes sent
+            self.offset += sent  # Move past them
+            if self.offset < len(head):  # If the socket buffer is full
+                return  # Try again next tick
+            self.queue.popleft()  # Drop the finished message
+            self.offset = 0  # Start the next message from its beginning
+
+class StreamServer(object):  # Define a class publishing each tick's game state to local spectators
+    def __init__(self, host="127.0.0.1", port=PORT):  # Initialize by listening on a local port
+        self.selector = selectors.DefaultSelector()  # Create the socket poller
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # Create the listening socket
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Allow quick restarts on the same port
+        self.listener.bind((host, port))  # Bind to the address
+        self.listener.listen()  # Start listening
+        self.listener.setblocking(False)  # Never wait on accept
+        self.selector.register(self.listener, selectors.EVENT_READ, None)  # Poll for new spectators
+        self.spectators = []  # Initialize the connected spectators
+        self.address = self.listener.getsockname()  # Get the bound address, useful when port 0 picked a free port
+
+    def publish(self, engine, eaten):  # Define the method to send one tick to every spectator without blocking the game
+        self.poll()  # Accept new spectators and notice closed ones
+        if not self.spectators:  # If nobody is watching
+            return  # Skip the encoding
+        delta = None  # Initialize the shared delta, encoded at most once
+        keyframe = None  # Initialize the shared keyframe, encoded at most once
+        for spectator in list(self.spectators):  # Iterate through each spectator
+            if spectator.needKeyframe:  # If the spectator needs the full state
+                if keyframe is None:  # If the keyframe was not encoded yet this tick
+                    keyframe = encodeKeyframe(engine)  # Encode it
+                spectator.pushKeyframe(keyframe)  # Queue the keyframe in place of the delta
+            else:  # Otherwise
+                if delta is None:  # If the delta was not encoded yet this tick
+                    delta = encodeDelta(engine, eaten)  # Encode it
+                spectator.push(delta)  # Queue the delta
+            try:  # Try to send
+                spectator.flush()  # Send what the socket takes
+            except (BlockingIOError, InterruptedError):  # If the socket is full
+                pass  # Leave the rest queued
+            except OSError:  # If the spectator went away
+                self.drop(spectator)  # Forget it
+
+    def resync(self):  # Define the method to send every spectator a keyframe, for when pellets were added or removed
+        for spectator in self.spectators:  # Iterate through each spectator
+            spectator.needKeyframe = True  # Resync it on the next tick
+
+    def poll(self):  # Define the method to handle socket events without waiting
+        for key, mask in self.selector.select(0):  # Iterate through each ready socket
+            if key.data is None:  # If it is the listening socket
+                self.accept()  # Accept the spectators waiting
+            else:  # Otherwise it is a spectator sending data or closing
+                self.read(key.data)  # Read it
+
+    def accept(self):  # Define the method to accept every waiting spectator
+        while True:  # Keep accepting until none are left
+            try:  # Try to accept
+                sock, address = self.listener.accept()  # Accept a connection
+            except (BlockingIOError, InterruptedError):  # If none are left
+                return  # Stop accepting
+            sock.setblocking(False)  # Never wait on the spectator
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Send small deltas without delay
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SENDBUFFER)  # Keep the kernel from hiding a slow client's backlog
+            spectator = Spectator(sock)  # Create the spectator
+            self.selector.register(sock, selectors.EVENT_READ, spectator)  # Poll it for closing
+            self.spectators.append(spectator)  # Add it to the spectators
+
+    def read(self, spectator):  # Define the method to discard anything a spectator sends and notice when it closes
+        try:  # Try to read
+            data = spectator.sock.recv(4096)  # Read what was sent
+        except (BlockingIOError, InterruptedError):  # If nothing was there after all
+            return  # Keep the spectator
+        except OSError:  # If the connection failed
+            data = b""  # Treat it as closed
+        if not data:  # If the spectator closed the connection
+            self.drop(spectator)  # Forget it
+
+    def drop(self, spectator):  # Define the method to forget a spectator
+        if spectator in self.spectators:  # If it is still connected
+            self.spectators.remove(spectator)  # Remove it from the spectators
+            self.selector.unregister(spectator.sock)  # Stop polling it
+            spectator.sock.close()  # Close the connection
+
+    def close(self):  # Define the method to stop serving
+        for spectator in list(self.spectators):  # Iterate through each spectator
+            self.drop(spectator)  # Disconnect it
+        self.selector.unregister(self.listener)  # Stop polling the listener
+        self.listener.close()  # Close the listener
+        self.selector.close()  # Close the poller
+
+class StreamState(object):  # Define a class rebuilding the game state from a stream of messages
+    def __init__(self):  # Initialize with no state until the first keyframe
+        self.buffer = bytearray()  # Initialize the bytes of any incomplete message
+        self.level = None  # Initialize the level name
+        self.tick = 0  # Initialize the tick
+        self.score = 0  # Initialize the score
+        self.position = (0.0, 0.0)  # Initialize Pacman's position
+        self.direction = STOP  # Initialize Pacman's direction
+        self.eaten = None  # Initialize the eaten flags
+        self.numEaten = 0  # Initialize the eaten count
+        self.keyframes = 0  # Initialize the number of keyframes received
+        self.deltas = 0  # Initialize the number of deltas received
+
+    def feed(self, data):  # Define the method to apply every complete message in a chunk of the stream
+        self.buffer += data  # Add the bytes to the buffer
+        start = 0  # Initialize the offset of the next message
+        while len(self.buffer) - start >= MESSAGE.size:  # While a message header is available
+            kind, length = MESSAGE.unpack_from(self.buffer, start)  # Read the header
+            end = start + MESSAGE.size + length  # Find the end of the message
+            if end > len(self.buffer):  # If the message is incomplete
+                break  # Wait for more bytes
+            self.apply(kind, memoryview(self.buffer)[start + MESSAGE.size:end])  # Apply the message
+            start = end  # Move on to the next message
+        del self.buffer[:start]  # Drop the applied messages
+
+    def apply(self, kind, payload):  # Define the method to apply one message
+        if kind == KEYFRAME:  # If it is the full state
+            self.tick, self.score, x, y, self.direction, count, namelength = KEYFRAMEHEADER.unpack_from(payload)  # Read the state
+            start = KEYFRAMEHEADER.size + namelength  # Find the start of the bitmap
+            self.level = bytes(payload[KEYFRAMEHEADER.size:start]).decode("utf-8")  # Read the level name
+            bits = np.frombuffer(payload, dtype=np.uint8, offset=start)  # Read the bitmap
+            self.eaten = np.unpackbits(bits, count=count, bitorder="little").astype(bool)  # Unpack the eaten flags
+            self.numEaten = int(self.eaten.sum())  # Count the pellets eaten
+            self.position = (x, y)  # Set Pacman's position
+            self.keyframes += 1  # Count the keyframe
+        elif kind == DELTA and self.eaten is not None:  # If it is one tick's changes and the state is known
+            self.tick, self.score, x, y, self.direction, count = DELTAHEADER.unpack_from(payload)  # Read the changes
+            indices = np.frombuffer(payload, dtype="<u4", count=count, offset=DELTAHEADER.size)  # Read the pellets eaten
+            self.eaten[indices] = True  # Mark them eaten
+            self.numEaten += count  # Count them
+            self.position = (x, y)  # Set Pacman's position
+            self.deltas += 1  # Count the delta
+
+class StreamClient(object):  # Define a headless spectator that connects to a server and keeps the state up to date
+    def __init__(self, host="127.0.0.1", port=PORT, recordPath=None):  # Initialize by connecting to the server
+        self.sock = socket.create_connection((host, port))  # Connect to the server
+        self.state = StreamState()  # Create the rebuilt state
+        self.record = open(recordPath, "wb") if recordPath is not None else None  # Open the file the raw stream is saved to
+
+    def receive(self, timeout=None):  # Define the method to wait for and apply the next chunk of the stream
+        self.sock.settimeout(timeout)  # Set how long to wait
+        try:  # Try to read
+            data = self.sock.recv(65536)  # Read what has arrived
+        except (socket.timeout, BlockingIOError):  # If nothing arrived in time
+            return True  # The connection is still open
+        if not data:  # If the server closed the connection
+            return False  # Report the end of the stream
+        if self.record is not None:  # If the stream is being saved
+            self.record.write(data)  # Save the raw bytes, which StreamState can replay later
+        self.state.feed(data)  # Apply the bytes
+        return True  # The connection is still open
+
+    def close(self):  # Define the method to disconnect
+        self.sock.close()  # Close the connection
+        if self.record is not None:  # If the stream was being saved
+            self.record.close()  # Close the file
+
+if __name__ == "__main__":  # If this module is run as the main program
+    parser = argparse.ArgumentParser(description="Watch a streamed Pacman game without a window")  # Create the argument parser
+    parser.add_argument("--host", default="127.0.0.1")  # Add the server address option
+    parser.add_argument("--port", type=int, default=PORT)  # Add the server port option
+    parser.add_argument("--out", help="save the raw stream to this file")  # Add the recording option
+    args = parser.parse_args()  # Parse the command line
+    client = StreamClient(args.host, args.port, args.out)  # Connect to the server
+    state = client.state  # Get the rebuilt state
+    last = time.perf_counter()  # Record the time of the last status line
+    while client.receive(1.0):  # Apply the stream until the server closes it
+        if time.perf_counter() - last >= 1.0 and state.eaten is not None:  # If a status line is due
+            last = time.perf_counter()  # Record the time
+            print("%s tick=%d score=%d eaten=%d/%d pacman=(%.1f, %.1f)" % (state.level, state.tick, state.score, state.numEaten,
+                                                                         len(state.eaten), state.position[0], state.position[1]))  # Print the state
+    client.close()  # Disconnect
@@ -1,10 +1,12 @@
 import math  # Import the math module for mathematical operations
 
 class Vector2(object):  # Define a class for 2D vectors
+    __slots__ = ("x", "y")  # Store only the coordinates on each instance
+    thresh = 0.000001  # Set a threshold for comparison to determine equality
+
     def __init__(self, x=0, y=0):  # Initialize the vector with x and y coordinates
         self.x = x  # Assign the x coordinate
         self.y = y  # Assign the y coordinate
-        self.thresh = 0.000001  # Set a threshold for comparison to determine equality
 
     def __add__(self, other):  # Define addition of two vectors
         return Vector2(self.x + other.x, self.y + other.y)  # Return the sum of two vectors
@@ -26,6 +28,36 @@ class Vector2(object):  # Define a class for 2D vectors
     def __truediv__(self, scalar):  # Define true division for Python 3 compatibility
         return self.__div__(scalar)  # Use the __div__ method for division
 
+    def __iadd__(self, other):  # Define in-place addition of another vector
+        self.x += other.x  # Add the x coordinates
+        self.y += other.y  # Add the y coordinates
+        return self  # Return the same vector
+
+    def __isub__(self, other):  # Define in-place subtraction of another vector
+        self.x -= other.x  # Subtract the x coordinates
+        self.y -= other.y  # Subtract the y coordinates
+        return self  # Return the same vector
+
+    def __imul__(self, scalar):  # Define in-place multiplication by a scalar
+        self.x *= scalar  # Scale the x coordinate
+        self.y *= scalar  # Scale the y coordinate
+        return self  # Return the same vector
+
+    def addScaled(self, other, scalar):  # Define in-place addition of another vector times a scalar
+        self.x += other.x * scalar  # Add the scaled x coordinate
+        self.y += other.y * scalar  # Add the scaled y coordinate
+        return self  # Return the same vector
+
+    def copyFrom(self, other):  # Define method to overwrite the coordinates with another vector's
+        self.x = other.x  # Copy the x coordinate
+        self.y = other.y  # Copy the y coordinate
+        return self  # Return the same vector
+
+    def distanceSquared(self, other):  # Define method to calculate the squared distance to another vector
+        dx = self.x - other.x  # Calculate the x difference
+        dy = self.y - other.y  # Calculate the y difference
+        return dx * dx + dy * dy  # Return the sum of squares of the differences
+
     def __eq__(self, other):  # Define equality check between two vectors
         if abs(self.x - other.x) < self.thresh:  # Check if x coordinates are approximately equal
             if abs(self.y - other.y) < self.thresh:  # Check if y coordinates are approximately equal